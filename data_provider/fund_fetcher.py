@@ -11,32 +11,545 @@
 4. 获取基金基本信息
 """
 
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import importlib.util
+import json
 import logging
-from typing import Optional, Dict, Any, List
+import os
+import pickle
+import platform
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Tuple, Union
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+from .base import DataFetchError
+
 try:
-    import akshare as ak
+    import httpx
 except ImportError:
-    ak = None
+    httpx = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# PyPy 下 pandas/NumPy 走 cpyext 兼容层，调用开销大；解析逻辑改走纯 Python 路径交给 JIT
+_IS_PYPY = platform.python_implementation() == 'PyPy'
+
+
+# 磁盘缓存默认目录
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'fund_fetcher'
+
+# 各类数据的缓存有效期（秒），<= 0 表示不缓存
+DEFAULT_CACHE_TTLS: Dict[str, float] = {
+    'fund_list': 24 * 3600,       # 全量基金列表
+    'info': 7 * 24 * 3600,        # 基金基本信息（晨星）
+    'nav': 6 * 3600,              # 净值走势，每个交易日晚间更新一次
+    'performance': 6 * 3600,      # 阶段涨幅
+    'holdings': 30 * 24 * 3600,   # 持仓按季度披露
+    'realtime': 60,               # 实时估值
+}
+
+# 每个交易日更新一次的数据：缓存除了不超过 TTL，还必须是当天写入的。
+# 定时任务每天同一时刻运行时，前一天的缓存年龄略小于 24h，只按 TTL 判断会漏掉新公布的净值
+DAILY_CACHE_KEYS = frozenset({'nav', 'performance'})
+
+# prefetch 支持的指标：结果键 -> (AkShare 指标名, 缓存有效期键)
+PREFETCH_INDICATORS: Dict[str, tuple] = {
+    'nav': ("单位净值走势", 'nav'),
+    'perf': ("阶段涨幅", 'performance'),
+    'holdings': ("基金持仓", 'holdings'),
+    'realtime': ("实时估值", 'realtime'),
+}
+
+# 阶段涨幅指标 -> 业绩字典键
+PERIOD_MAP: Dict[str, str] = {
+    '近1周': 'week_1',
+    '近1月': 'month_1',
+    '近3月': 'month_3',
+    '近6月': 'month_6',
+    '近1年': 'year_1',
+    '近3年': 'year_3',
+}
+_PERIOD_PATTERN = '(' + '|'.join(PERIOD_MAP) + ')'
+_PERIOD_RE = re.compile(_PERIOD_PATTERN)
+
+# 持仓列 -> 输出字段，以及列缺失时的默认值
+HOLDING_COLUMNS: Dict[str, str] = {
+    '股票代码': 'stock_code',
+    '股票名称': 'stock_name',
+    '持仓占比': 'ratio',
+}
+HOLDING_DEFAULTS: Dict[str, Any] = {
+    '股票代码': '',
+    '股票名称': '',
+    '持仓占比': 0,
+}
+
+# 天天基金历史净值 JSON 接口（需携带 Referer，否则返回空数据）
+LSJZ_URL = "https://api.fund.eastmoney.com/f10/lsjz"
+LSJZ_HEADERS = {
+    'Referer': 'https://fundf10.eastmoney.com/',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+}
+
+
+def _parse_nav_dates(dates: pd.Series) -> pd.Series:
+    """
+    解析净值日期
+    
+    优先按固定格式解析（跳过逐个元素的格式推断，且相同字符串只解析一次），
+    格式不一致时回退到逐个推断。
+    """
+    try:
+        return pd.to_datetime(dates, format='%Y-%m-%d', cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(dates, format='mixed', cache=True)
+
+
+def _lsjz_to_frame(data: Any) -> Optional[pd.DataFrame]:
+    """
+    将 lsjz 接口返回的 JSON 转为与 AkShare "单位净值走势" 相同列名的 DataFrame
+    
+    便于复用 get_fund_nav_from 的解析逻辑。
+    """
+    records = ((data or {}).get('Data') or {}).get('LSJZList') or []
+    if not records:
+        return None
+    df = pd.DataFrame.from_records(records, columns=['FSRQ', 'DWJZ', 'JZZZL'])
+    return df.rename(columns={'FSRQ': '净值日期', 'DWJZ': '单位净值', 'JZZZL': '日增长率'})
+
+
+class _LsjzPager:
+    """
+    lsjz 接口分页拉取最近 rows 条净值
+    
+    接口单页条数可能有上限（第一页返回的条数少于请求的 pageSize），
+    此时按第一页的实际条数继续翻页，直到取满 min(rows, TotalCount) 条或没有更多数据。
+    只负责请求参数与结果拼接，由同步/异步两种调用方各自发出请求。
+    """
+    
+    def __init__(self, fund_code: str, rows: int):
+        self.fund_code = fund_code
+        self.rows = rows
+        self.page_index = 1
+        self.page_size = rows
+        self.total = 0  # 接口返回的净值总条数，未返回时为 0
+        self.done = False
+        self._frames: List[pd.DataFrame] = []
+        self._count = 0
+    
+    @property
+    def params(self) -> Dict[str, Any]:
+        """下一页的请求参数"""
+        return {'fundCode': self.fund_code, 'pageIndex': self.page_index, 'pageSize': self.page_size}
+    
+    def add(self, data: Any) -> None:
+        """加入一页响应，判断是否还需要翻页"""
+        frame = _lsjz_to_frame(data)
+        self.total = int((data or {}).get('TotalCount') or 0)
+        if frame is None:
+            self.done = True
+            return
+        
+        self._frames.append(frame)
+        self._count += len(frame)
+        if self.page_index == 1:
+            self.page_size = len(frame)  # 后续按接口实际的页大小翻页
+        elif len(frame) < self.page_size:
+            self.done = True  # 最后一页
+        self.page_index += 1
+        
+        target = min(self.rows, self.total) if self.total else self.rows
+        if self._count >= target:
+            self.done = True
+    
+    def result(self) -> Tuple[Optional[pd.DataFrame], int]:
+        """
+        Returns:
+            (最近 rows 条原始数据（按日期降序），净值总条数)；
+            接口未返回总条数时以实际取到的条数代替
+        """
+        if not self._frames:
+            return None, self.total
+        df = self._frames[0] if len(self._frames) == 1 else pd.concat(self._frames, ignore_index=True)
+        if self._count < min(self.rows, self.total):
+            logger.debug(f"基金 {self.fund_code} 净值只取到 {self._count}/{min(self.rows, self.total)} 条")
+        return df.head(self.rows), self.total or self._count
+
+
+def _parse_performance_records(records: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    纯 Python 解析 "阶段涨幅" 记录（PyPy 路径）
+    
+    结果与 get_fund_performance_from 的向量化实现一致：
+    指标名中含 PERIOD_MAP 的键才保留，涨幅去掉百分号后转为 float，无法解析的记为 0。
+    """
+    performance: Dict[str, float] = {}
+    for row in records:
+        match = _PERIOD_RE.search(str(row.get('指标', '')))
+        if match is None:
+            continue
+        value = row.get('涨幅')
+        try:
+            value = float(str(value).rstrip('%')) if value is not None else 0.0
+        except ValueError:
+            value = 0.0
+        performance[PERIOD_MAP[match.group(1)]] = value if value == value else 0.0  # NaN 记为 0
+    return performance
+
+
+def _parse_holding_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """纯 Python 解析 "基金持仓" 记录（PyPy 路径），缺失的列按默认值补齐"""
+    return [
+        {out: row.get(col, HOLDING_DEFAULTS[col]) for col, out in HOLDING_COLUMNS.items()}
+        for row in records
+    ]
+
+
+async def _fetch_json(client: Any, url: str, params: Dict[str, Any]) -> Any:
+    """异步 GET 并解析 JSON（优先使用 orjson）"""
+    resp = await client.get(url, params=params)
+    resp.raise_for_status()
+    return _json_loads(resp.content)
+
+
+class _AsyncTokenBucket:
+    """
+    异步令牌桶限流器
+    
+    每秒补充 rate 个令牌，最多积攒 capacity 个，用于控制并发请求的发送速率。
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
 
 class FundDataFetcher:
     """基金数据获取器"""
     
-    def __init__(self):
-        """初始化基金数据获取器"""
-        if ak is None:
+    # 净值 JSON 接口的流控参数
+    NAV_BATCH_RATE = 5.0  # 批量异步获取时每秒最多发出的请求数
+    NAV_BATCH_BURST = 5  # 允许的突发请求数
+    NAV_REQUEST_TIMEOUT = 15.0  # 单个请求超时（秒）
+    
+    # 净值历史增量更新参数
+    NAV_INCREMENT_PAGE = 20  # 已有历史时每次只拉取最近多少条
+    NAV_HISTORY_MAX_ROWS = 1000  # 每只基金最多保留多少条历史
+    
+    # prefetch 线程池大小（所有基金共享，即同时发往 AkShare 的请求上限）
+    PREFETCH_MAX_WORKERS = 3
+    
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        prefetch_workers: Optional[int] = None
+    ):
+        """
+        初始化基金数据获取器
+        
+        Args:
+            cache_dir: AkShare 响应的磁盘缓存目录，默认 ~/.cache/fund_fetcher/
+            ttls: 各类数据的缓存有效期（秒），覆盖 DEFAULT_CACHE_TTLS 中的同名项
+            prefetch_workers: prefetch 共享线程池大小，默认 PREFETCH_MAX_WORKERS
+        """
+        # AkShare 导入耗时数秒，这里只检查是否安装，首次使用时再导入
+        if importlib.util.find_spec('akshare') is None:
             logger.warning("AkShare 未安装，请运行: pip install akshare")
-        # 缓存基金列表，避免重复获取
-        self._fund_list_df = None
+        # 缓存基金列表（基金代码 -> 信息字典），避免重复获取
+        self._fund_info_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._fund_list_lock = threading.Lock()
+        # 按基金代码缓存基本信息，同一进程内重复查询不再请求
+        self._get_info_cached = functools.lru_cache(maxsize=4096)(self._fetch_fund_info)
+        
+        # 磁盘缓存：跨进程复用 AkShare 响应，避免每次运行都重新抓取
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else DEFAULT_CACHE_DIR
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        
+        # 净值 JSON 接口的同步客户端，复用连接池（httpx.Client 线程安全）
+        self._http = httpx.Client(headers=LSJZ_HEADERS, timeout=self.NAV_REQUEST_TIMEOUT) if httpx else None
+        
+        # prefetch 的共享线程池：不为每只基金新建线程，且同时发往 AkShare 的请求数有上限
+        self._prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=prefetch_workers or self.PREFETCH_MAX_WORKERS,
+            thread_name_prefix='fund-prefetch'
+        )
+    
+    def close(self) -> None:
+        """关闭 prefetch 线程池并释放网络连接，获取器不再使用时调用"""
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        if self._http is not None:
+            self._http.close()
+    
+    @classmethod
+    def _ak(cls) -> Optional[Any]:
+        """
+        按需导入 AkShare
+        
+        AkShare 会连带导入大量依赖，耗时数秒；延迟到第一次真正请求数据时才导入，
+        dry-run 或无基金可分析等提前退出的场景不再承担这部分启动开销。
+        
+        Returns:
+            akshare 模块，未安装时返回 None
+        """
+        if not hasattr(cls, '_ak_mod'):
+            try:
+                import akshare
+            except ImportError:
+                akshare = None
+            cls._ak_mod = akshare
+        return cls._ak_mod
+    
+    def _cached_call(self, key: tuple, ttl: float, fn: Callable[[], Any], daily: bool = False) -> Any:
+        """
+        带 TTL 的磁盘缓存调用
+        
+        以 key（接口名, 基金代码, 指标）的哈希作为文件名，缓存文件的修改时间
+        未超过 ttl 秒时直接读取，否则调用 fn 并写回缓存。空结果不缓存。
+        
+        Args:
+            key: 缓存键，如 ('fund_open_fund_info_em', '000001', '单位净值走势')
+            ttl: 缓存有效期（秒），<= 0 时直接调用 fn
+            fn: 实际的数据获取函数
+            daily: 是否为每日更新的数据（缓存还须是当天写入的，见 _is_fresh）
             
+        Returns:
+            fn 的返回值（DataFrame 或 dict）
+        """
+        if ttl <= 0:
+            return fn()
+        
+        hit, data = self._cache_get(key, ttl, daily)
+        if hit:
+            return data
+        
+        data = fn()
+        self._cache_put(key, data)
+        return data
+    
+    def _cache_path(self, key: tuple) -> Path:
+        """缓存键对应的文件路径"""
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.pkl"
+    
+    @staticmethod
+    def _is_fresh(path: Path, ttl: float, daily: bool = False) -> bool:
+        """
+        缓存文件是否未过期
+        
+        修改时间未超过 ttl 秒即有效；daily 为 True 时还要求文件是今天写入的
+        （前一天写入的每日数据一律视为过期，不依赖运行时刻与 TTL 的相对关系）。
+        """
+        mtime = path.stat().st_mtime
+        now = time.time()
+        if now - mtime >= ttl:
+            return False
+        return not daily or datetime.fromtimestamp(mtime).date() == datetime.fromtimestamp(now).date()
+    
+    def _cache_get(self, key: tuple, ttl: float, daily: bool = False) -> Tuple[bool, Any]:
+        """读取未过期的缓存，返回 (是否命中, 数据)"""
+        if ttl <= 0:
+            return False, None
+        
+        path = self._cache_path(key)
+        try:
+            if path.exists() and self._is_fresh(path, ttl, daily):
+                with path.open('rb') as f:
+                    data = pickle.load(f)
+                logger.debug(f"[缓存命中] {key}")
+                return True, data
+        except Exception as e:
+            logger.debug(f"读取缓存失败 {key}: {e}")
+        return False, None
+    
+    def _cache_put(self, key: tuple, data: Any) -> None:
+        """写入缓存，空结果不缓存"""
+        if data is None or (isinstance(data, pd.DataFrame) and data.empty):
+            return
+        
+        try:
+            self._write_pickle(self._cache_path(key), data)
+        except Exception as e:
+            logger.debug(f"写入缓存失败 {key}: {e}")
+    
+    @staticmethod
+    def _write_pickle(path: Path, data: Any) -> None:
+        """先写临时文件再原子替换，避免并发线程读到半截文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open('wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    
+    def _nav_history_path(self, fund_code: str) -> Path:
+        """净值历史文件路径"""
+        return self.cache_dir / 'nav' / f"{fund_code}.pkl"
+    
+    def _load_nav_history(self, fund_code: str, days: int) -> Tuple[Optional[pd.DataFrame], bool]:
+        """
+        读取本地净值历史
+        
+        历史文件保存 (历史 DataFrame, 接口返回的净值总条数)。
+        
+        Returns:
+            (历史 DataFrame, 是否无需更新)。历史按日期升序、列名与 lsjz 原始数据一致；
+            条数不足 min(days, 净值总条数) 的历史视为不存在，需要全量获取
+            （成立不久、净值本就不足 days 条的基金，取全即视为完整）
+        """
+        path = self._nav_history_path(fund_code)
+        try:
+            if not path.exists():
+                return None, False
+            with path.open('rb') as f:
+                history, total = pickle.load(f)
+            if len(history) < min(days, total):
+                return None, False
+            fresh = self._is_fresh(path, self.ttls.get('nav', 0), daily=True)
+            return history, fresh
+        except Exception as e:
+            logger.debug(f"读取基金 {fund_code} 净值历史失败: {e}")
+            return None, False
+    
+    def _update_nav_history(
+        self, fund_code: str, history: Optional[pd.DataFrame], new: Optional[pd.DataFrame], total: int
+    ) -> Optional[pd.DataFrame]:
+        """
+        将新拉取的净值合并进本地历史并写回
+        
+        Args:
+            fund_code: 基金代码
+            history: 本地历史，None 表示 new 是一次全量获取
+            new: 新拉取的 lsjz 原始数据
+            total: 接口返回的净值总条数，随历史一起保存，用于判断历史是否完整
+            
+        Returns:
+            合并后的历史（按日期升序）；new 与历史之间有缺口时返回 None，调用方应全量获取
+        """
+        if new is None or new.empty:
+            return history
+        
+        if history is not None:
+            # 增量页最早的日期仍晚于历史最后一天，说明中间有缺口（如长时间未运行）
+            if new['净值日期'].min() > history['净值日期'].iloc[-1]:
+                return None
+            new = pd.concat([history, new], ignore_index=True)
+        
+        merged = (
+            new.drop_duplicates('净值日期', keep='last')
+            .sort_values('净值日期')
+            .tail(self.NAV_HISTORY_MAX_ROWS)
+            .reset_index(drop=True)
+        )
+        try:
+            self._write_pickle(self._nav_history_path(fund_code), (merged, total))
+        except Exception as e:
+            logger.debug(f"写入基金 {fund_code} 净值历史失败: {e}")
+        return merged
+    
+    def _fetch_open_fund_info(self, fund_code: str, indicator: str, ttl_key: str) -> Optional[pd.DataFrame]:
+        """
+        获取开放式基金指标数据（带磁盘缓存）
+        
+        兼容新旧接口: fund_open_fund_info_em(symbol=) / fund_em_open_fund_info(fund=)
+        
+        Args:
+            fund_code: 基金代码
+            indicator: AkShare 指标名，如 "单位净值走势"
+            ttl_key: self.ttls 中对应的缓存有效期键
+            
+        Returns:
+            AkShare 返回的原始 DataFrame，接口不可用时返回 None
+        """
+        ak = self._ak()
+        if hasattr(ak, 'fund_open_fund_info_em'):
+            endpoint = 'fund_open_fund_info_em'
+            fn = lambda: ak.fund_open_fund_info_em(symbol=fund_code, indicator=indicator)
+        elif hasattr(ak, 'fund_em_open_fund_info'):
+            endpoint = 'fund_em_open_fund_info'
+            fn = lambda: ak.fund_em_open_fund_info(fund=fund_code, indicator=indicator)
+        else:
+            logger.error("未找到可用的基金数据接口 (fund_open_fund_info_em)")
+            return None
+        
+        return self._cached_call(
+            (endpoint, fund_code, indicator), self.ttls.get(ttl_key, 0), fn, daily=ttl_key in DAILY_CACHE_KEYS
+        )
+            
+    def _get_fund_list(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        获取全量基金列表（按基金代码建立字典索引）
+        
+        多线程并发分析时只会下载一次：加锁后再次检查，避免每个线程各抓一遍。
+        列表只在首次加载时转换一次，之后每次查询都是一次哈希查找，
+        不再对上万行的 DataFrame 做过滤或复制。
+        
+        Returns:
+            {基金代码: 该行信息字典}，获取失败返回 None
+        """
+        if self._fund_info_index is not None:
+            return self._fund_info_index
+        
+        with self._fund_list_lock:
+            if self._fund_info_index is not None:
+                return self._fund_info_index
+            
+            try:
+                ak = self._ak()
+                if hasattr(ak, 'fund_name_em'):
+                    df = self._cached_call(
+                        ('fund_name_em', None, None), self.ttls.get('fund_list', 0), ak.fund_name_em
+                    )
+                elif hasattr(ak, 'fund_em_fund_name'):
+                    df = self._cached_call(
+                        ('fund_em_fund_name', None, None), self.ttls.get('fund_list', 0), ak.fund_em_fund_name
+                    )
+                else:
+                    logger.error("未找到可用的基金列表接口 (fund_name_em/fund_em_fund_name)")
+                    return None
+            except Exception as e:
+                logger.error(f"获取基金列表失败: {e}")
+                return None
+            
+            if df is None or df.empty:
+                return None
+            
+            # 建立哈希索引，按代码查找无需逐行比较；代码重复时保留第一条
+            self._fund_info_index = (
+                df.drop_duplicates('基金代码').set_index('基金代码').to_dict(orient='index')
+            )
+            return self._fund_info_index
+    
     def get_fund_info(self, fund_code: str) -> Optional[Dict[str, Any]]:
         """
-        获取基金基本信息
+        获取基金基本信息（进程内按基金代码缓存）
         
         Args:
             fund_code: 基金代码（6位数字）
@@ -45,6 +558,26 @@ class FundDataFetcher:
             基金基本信息字典
         """
         try:
+            return dict(self._get_info_cached(fund_code))
+        except DataFetchError:
+            return None
+    
+    def _fetch_fund_info(self, fund_code: str) -> Dict[str, Any]:
+        """
+        获取基金基本信息，供 lru_cache 包装
+        
+        失败时抛出 DataFetchError 而不是返回 None，lru_cache 不缓存异常，
+        保证一次网络失败不会让该基金在整个进程内都查不到信息。
+        """
+        info = self._load_fund_info(fund_code)
+        if info is None:
+            raise DataFetchError(f"获取基金 {fund_code} 信息失败")
+        return info
+    
+    def _load_fund_info(self, fund_code: str) -> Optional[Dict[str, Any]]:
+        """获取基金基本信息（无缓存）"""
+        try:
+            ak = self._ak()
             if ak is None:
                 logger.error("AkShare 未安装")
                 return None
@@ -53,7 +586,11 @@ class FundDataFetcher:
             try:
                 # 尝试使用新版接口（如果有）
                 if hasattr(ak, 'fund_individual_basic_info_xf'):
-                    df_info = ak.fund_individual_basic_info_xf(symbol=fund_code)
+                    df_info = self._cached_call(
+                        ('fund_individual_basic_info_xf', fund_code, None),
+                        self.ttls.get('info', 0),
+                        lambda: ak.fund_individual_basic_info_xf(symbol=fund_code)
+                    )
                     if df_info is not None and not df_info.empty:
                         # 解析晨星数据
                         # 通常包含：基金代码, 基金名称, 基金类型, 成立日期, ...
@@ -61,36 +598,21 @@ class FundDataFetcher:
                         # 暂时只取名称，如果需要更多信息可以进一步解析
                         return {
                             'code': fund_code,
-                            'name': df_info['基金名称'].iloc[0] if '基金名称' in df_info.columns else '',
-                            'type': df_info['基金类型'].iloc[0] if '基金类型' in df_info.columns else '',
-                            'company': df_info['基金管理人'].iloc[0] if '基金管理人' in df_info.columns else '',
-                            'manager': df_info['基金经理'].iloc[0] if '基金经理' in df_info.columns else '',
+                            'name': df_info['基金名称'].iat[0] if '基金名称' in df_info.columns else '',
+                            'type': df_info['基金类型'].iat[0] if '基金类型' in df_info.columns else '',
+                            'company': df_info['基金管理人'].iat[0] if '基金管理人' in df_info.columns else '',
+                            'manager': df_info['基金经理'].iat[0] if '基金经理' in df_info.columns else '',
                         }
             except Exception as e_xf:
                 logger.debug(f"晨星接口获取失败，尝试备用接口: {e_xf}")
 
             # 2. 回退到 fund_name_em (获取全量列表)
-            if self._fund_list_df is None:
-                try:
-                    if hasattr(ak, 'fund_name_em'):
-                         self._fund_list_df = ak.fund_name_em()
-                    elif hasattr(ak, 'fund_em_fund_name'):
-                         self._fund_list_df = ak.fund_em_fund_name()
-                    else:
-                        logger.error("未找到可用的基金列表接口 (fund_name_em/fund_em_fund_name)")
-                        return None
-                except Exception as e:
-                    logger.error(f"获取基金列表失败: {e}")
-                    return None
-
-            if self._fund_list_df is not None:
-                fund_info = self._fund_list_df[self._fund_list_df['基金代码'] == fund_code]
-                
-                if fund_info.empty:
+            fund_index = self._get_fund_list()
+            if fund_index is not None:
+                info = fund_index.get(fund_code)
+                if info is None:
                     logger.warning(f"未找到基金 {fund_code} 的信息")
                     return None
-                    
-                info = fund_info.iloc[0].to_dict()
                 
                 return {
                     'code': fund_code,
@@ -106,61 +628,233 @@ class FundDataFetcher:
             logger.error(f"获取基金 {fund_code} 信息失败: {e}")
             return None
     
-    def get_fund_nav(self, fund_code: str, days: int = 120) -> Optional[pd.DataFrame]:
+    def prefetch(self, fund_code: str, indicators: Optional[List[str]] = None) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        并发预取单只基金的多个指标数据
+        
+        各指标原本是相互独立的 HTTP 请求，串行调用时延迟叠加；
+        这里提交到获取器共享的线程池同时发出（多只基金同时预取时总并发受线程池大小限制），
+        结果交给 get_*_from 系列方法解析。
+        
+        Args:
+            fund_code: 基金代码
+            indicators: 需要预取的指标（PREFETCH_INDICATORS 的键），默认全部
+            
+        Returns:
+            {'nav': df, 'perf': df, 'holdings': df, 'realtime': df}，获取失败的项为 None
+        """
+        names = list(indicators or PREFETCH_INDICATORS)
+        if self._ak() is None:
+            logger.error("AkShare 未安装")
+            return {name: None for name in names}
+        
+        try:
+            futures = {
+                name: self._prefetch_executor.submit(self._fetch_open_fund_info, fund_code, *PREFETCH_INDICATORS[name])
+                for name in names
+            }
+        except RuntimeError:
+            # 获取器已关闭（如流水线超时后放弃的任务才开始预取），不再发出请求
+            logger.debug(f"获取器已关闭，跳过预取基金 {fund_code}")
+            return {name: None for name in names}
+        
+        results: Dict[str, Optional[pd.DataFrame]] = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.warning(f"预取基金 {fund_code} {name} 数据失败: {e}")
+                results[name] = None
+        return results
+    
+    def prefetch_nav_batch(self, fund_codes: List[str], days: int = 120) -> Dict[str, pd.DataFrame]:
+        """
+        批量异步获取多只基金的净值原始数据
+        
+        直接请求天天基金 lsjz JSON 接口，在单个事件循环中通过共享连接池
+        并发发出全部请求（令牌桶限流），替代逐只基金阻塞等待 AkShare。
+        返回的 DataFrame 与 AkShare "单位净值走势" 列名一致，可直接交给
+        get_fund_nav_from 解析。
+        
+        Args:
+            fund_codes: 基金代码列表
+            days: 每只基金获取多少条净值
+            
+        Returns:
+            {基金代码: 原始净值 DataFrame}，获取失败的基金不在结果中（调用方应回退到 AkShare）
+        """
+        if httpx is None or not fund_codes:
+            return {}
+        
+        try:
+            return asyncio.run(self._prefetch_nav_batch_async(list(fund_codes), days))
+        except Exception as e:
+            logger.warning(f"批量获取净值失败，将逐只使用 AkShare 获取: {e}")
+            return {}
+    
+    async def _prefetch_nav_batch_async(self, fund_codes: List[str], days: int) -> Dict[str, pd.DataFrame]:
+        """prefetch_nav_batch 的异步实现"""
+        limiter = _AsyncTokenBucket(self.NAV_BATCH_RATE, self.NAV_BATCH_BURST)
+        http2 = importlib.util.find_spec('h2') is not None
+        
+        async with httpx.AsyncClient(headers=LSJZ_HEADERS, timeout=self.NAV_REQUEST_TIMEOUT, http2=http2) as client:
+            results = await asyncio.gather(
+                *(self._fetch_nav_async(client, limiter, code, days) for code in fund_codes),
+                return_exceptions=True
+            )
+        
+        nav_map: Dict[str, pd.DataFrame] = {}
+        for code, result in zip(fund_codes, results):
+            if isinstance(result, Exception):
+                logger.debug(f"异步获取基金 {code} 净值失败: {result}")
+            elif result is not None and not result.empty:
+                nav_map[code] = result
+        logger.info(f"批量获取净值完成: {len(nav_map)}/{len(fund_codes)}")
+        return nav_map
+    
+    async def _fetch_nav_async(self, client: Any, limiter: _AsyncTokenBucket, fund_code: str, days: int) -> Optional[pd.DataFrame]:
+        """异步获取单只基金净值（增量更新本地历史，逻辑同 _fetch_nav_json）"""
+        history, fresh = self._load_nav_history(fund_code, days)
+        if fresh:
+            return history
+        
+        async def fetch(rows: int) -> Tuple[Optional[pd.DataFrame], int]:
+            pager = _LsjzPager(fund_code, rows)
+            while not pager.done:
+                await limiter.acquire()
+                pager.add(await _fetch_json(client, LSJZ_URL, pager.params))
+            return pager.result()
+        
+        if history is not None:
+            merged = self._update_nav_history(fund_code, history, *await fetch(self.NAV_INCREMENT_PAGE))
+            if merged is not None:
+                return merged
+        return self._update_nav_history(fund_code, None, *await fetch(days))
+    
+    def _fetch_nav_json(self, fund_code: str, page_size: int) -> Optional[pd.DataFrame]:
+        """
+        通过天天基金 lsjz JSON 接口获取最近 page_size 条净值（增量更新本地历史）
+        
+        AkShare 的 "单位净值走势" 需要抓取并用正则解析整段 JS 页面；
+        该接口直接返回 JSON，解析开销小得多，且只返回需要的条数
+        （单页条数有上限时自动翻页，见 _LsjzPager）。
+        
+        每只基金的净值历史保存在 cache_dir/nav/{基金代码}.pkl，跨运行复用：
+        历史未过期时不发请求；过期后只拉取最近 NAV_INCREMENT_PAGE 条合并进去，
+        与历史之间有缺口或尚无历史时才全量拉取 page_size 条。
+        
+        Args:
+            fund_code: 基金代码
+            page_size: 获取多少条净值
+            
+        Returns:
+            与 AkShare "单位净值走势" 列名一致的原始 DataFrame，失败返回 None
+        """
+        if self._http is None:
+            return None
+        
+        def fetch(rows: int) -> Tuple[Optional[pd.DataFrame], int]:
+            pager = _LsjzPager(fund_code, rows)
+            while not pager.done:
+                resp = self._http.get(LSJZ_URL, params=pager.params)
+                resp.raise_for_status()
+                pager.add(_json_loads(resp.content))
+            return pager.result()
+        
+        try:
+            history, fresh = self._load_nav_history(fund_code, page_size)
+            if fresh:
+                return history
+            if history is not None:
+                merged = self._update_nav_history(fund_code, history, *fetch(self.NAV_INCREMENT_PAGE))
+                if merged is not None:
+                    return merged
+            return self._update_nav_history(fund_code, None, *fetch(page_size))
+        except Exception as e:
+            logger.debug(f"lsjz 接口获取基金 {fund_code} 净值失败，回退到 AkShare: {e}")
+            return None
+    
+    def get_fund_nav(
+        self, fund_code: str, days: int = 120, needs_close_volume: bool = False
+    ) -> Optional[pd.DataFrame]:
         """
         获取基金净值数据
         
         Args:
             fund_code: 基金代码
             days: 获取多少天的数据
+            needs_close_volume: 是否补充 close/volume 列（供按股票 K 线格式处理的调用方使用）
             
         Returns:
             包含净值数据的 DataFrame
         """
-        try:
-            if ak is None:
+        # 优先走 JSON 接口，失败时回退到 AkShare
+        df = self._fetch_nav_json(fund_code, days)
+        if df is None:
+            if self._ak() is None:
                 logger.error("AkShare 未安装")
                 return None
-                
-            # 获取基金净值数据
-            # 兼容新旧接口: fund_open_fund_info_em(symbol=) / fund_em_open_fund_info(fund=)
-            df = None
-            if hasattr(ak, 'fund_open_fund_info_em'):
-                df = ak.fund_open_fund_info_em(symbol=fund_code, indicator="单位净值走势")
-            elif hasattr(ak, 'fund_em_open_fund_info'):
-                df = ak.fund_em_open_fund_info(fund=fund_code, indicator="单位净值走势")
-            else:
-                logger.error("未找到可用的基金净值接口 (fund_open_fund_info_em)")
+            
+            try:
+                df = self._fetch_open_fund_info(fund_code, "单位净值走势", 'nav')
+            except Exception as e:
+                logger.error(f"获取基金 {fund_code} 净值数据失败: {e}")
                 return None
+        
+        return self.get_fund_nav_from(df, fund_code, days, needs_close_volume)
+    
+    def get_fund_nav_from(
+        self,
+        df: Optional[pd.DataFrame],
+        fund_code: str,
+        days: int = 120,
+        needs_close_volume: bool = False
+    ) -> Optional[pd.DataFrame]:
+        """
+        从 AkShare "单位净值走势" 原始数据解析净值
+        
+        Args:
+            df: AkShare 返回的原始 DataFrame（可来自 prefetch）
+            fund_code: 基金代码
+            days: 保留最近多少天的数据
+            needs_close_volume: 是否补充 close/volume 列
             
+        Returns:
+            包含 date, nav, change_pct 列的 DataFrame
+        """
+        try:
             if df is None or df.empty:
                 logger.warning(f"未找到基金 {fund_code} 的净值数据")
                 return None
             
-            # 重命名列
-            df = df.rename(columns={
-                '净值日期': 'date',
-                '单位净值': 'nav',
-                '日增长率': 'change_pct'
-            })
+            # 源数据通常已有序（AkShare 升序、lsjz 接口降序）：直接切片取最近 days 行，
+            # 只解析需要的部分，且无需 O(n log n) 的全量排序
+            raw_dates = df['净值日期']
+            if raw_dates.is_monotonic_increasing:
+                df = df.iloc[-days:]
+            elif raw_dates.is_monotonic_decreasing:
+                df = df.iloc[:days].iloc[::-1]
             
-            # 转换数据类型
-            df['date'] = pd.to_datetime(df['date'])
-            df['nav'] = pd.to_numeric(df['nav'], errors='coerce')
-            df['change_pct'] = pd.to_numeric(df['change_pct'], errors='coerce')
+            # 只保留分析需要的列，并转换数据类型
+            # 净值只有 4 位小数，float32 足够，下游均线计算的内存带宽减半
+            df = pd.DataFrame({
+                'date': _parse_nav_dates(df['净值日期']),
+                'nav': pd.to_numeric(df['单位净值'], errors='coerce', downcast='float'),
+                'change_pct': pd.to_numeric(df['日增长率'], errors='coerce', downcast='float'),
+            })
             
-            # 按日期排序
-            df = df.sort_values('date', ascending=True)
+            # 源数据无序时才排序，并只保留最近的数据
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date', ascending=True).tail(days)
             
-            # 只保留最近的数据
-            if len(df) > days:
-                df = df.tail(days)
+            df = df.reset_index(drop=True)
             
-            # 添加技术指标需要的列
-            df['close'] = df['nav']  # 用净值作为收盘价
-            df['volume'] = 0  # 基金没有成交量，填充0
+            # 按需补充 K 线格式的列（FundTrendAnalyzer 只读取 date/nav，不需要）
+            if needs_close_volume:
+                df['close'] = df['nav'].values  # 用净值作为收盘价，共享底层数组
+                df['volume'] = np.zeros(len(df), dtype=np.int8)  # 基金没有成交量，填充0
             
-            return df.reset_index(drop=True)
+            return df
             
         except Exception as e:
             logger.error(f"获取基金 {fund_code} 净值数据失败: {e}")
@@ -176,49 +870,46 @@ class FundDataFetcher:
         Returns:
             业绩数据字典
         """
+        if self._ak() is None:
+            logger.error("AkShare 未安装")
+            return None
+        
         try:
-            if ak is None:
-                logger.error("AkShare 未安装")
-                return None
-            
             # 获取基金阶段涨幅
-            # 兼容新旧接口
-            df = None
-            if hasattr(ak, 'fund_open_fund_info_em'):
-                df = ak.fund_open_fund_info_em(symbol=fund_code, indicator="阶段涨幅")
-            elif hasattr(ak, 'fund_em_open_fund_info'):
-                df = ak.fund_em_open_fund_info(fund=fund_code, indicator="阶段涨幅")
-            else:
-                logger.error("未找到可用的基金业绩接口")
-                return None
+            df = self._fetch_open_fund_info(fund_code, "阶段涨幅", 'performance')
+        except Exception as e:
+            logger.error(f"获取基金 {fund_code} 业绩数据失败: {e}")
+            return None
+        
+        return self.get_fund_performance_from(df, fund_code)
+    
+    def get_fund_performance_from(self, df: Optional[pd.DataFrame], fund_code: str) -> Optional[Dict[str, Any]]:
+        """
+        从 AkShare "阶段涨幅" 原始数据解析业绩
+        
+        Args:
+            df: AkShare 返回的原始 DataFrame（可来自 prefetch）
+            fund_code: 基金代码
             
+        Returns:
+            业绩数据字典
+        """
+        try:
             if df is None or df.empty:
                 logger.warning(f"未找到基金 {fund_code} 的业绩数据")
                 return None
             
-            performance = {}
-            for _, row in df.iterrows():
-                period = row.get('指标', '')
-                value = row.get('涨幅', 0)
-                
-                # 转换为数值
-                try:
-                    value = float(str(value).replace('%', ''))
-                except:
-                    value = 0
-                    
-                if '近1周' in period:
-                    performance['week_1'] = value
-                elif '近1月' in period:
-                    performance['month_1'] = value
-                elif '近3月' in period:
-                    performance['month_3'] = value
-                elif '近6月' in period:
-                    performance['month_6'] = value
-                elif '近1年' in period:
-                    performance['year_1'] = value
-                elif '近3年' in period:
-                    performance['year_3'] = value
+            if _IS_PYPY:
+                return _parse_performance_records(df.to_dict('records'))
+            
+            # 向量化解析：去掉百分号后整列一次转为数值，无法解析的记为 0
+            # （替代逐行 float(str(v).replace('%', '')) + try/except）
+            values = pd.to_numeric(
+                df['涨幅'].astype('string').str.rstrip('%'), errors='coerce'
+            ).fillna(0.0).to_numpy(dtype=np.float64)
+            keys = df['指标'].astype('string').str.extract(_PERIOD_PATTERN, expand=False).map(PERIOD_MAP)
+            mask = keys.notna().to_numpy()
+            performance = dict(zip(keys[mask], values[mask].tolist()))
                     
             return performance
             
@@ -236,67 +927,90 @@ class FundDataFetcher:
         Returns:
             持仓列表
         """
+        if self._ak() is None:
+            logger.error("AkShare 未安装")
+            return None
+        
         try:
-            if ak is None:
-                logger.error("AkShare 未安装")
-                return None
-            
             # 获取基金持仓
-            # 兼容新旧接口
-            df = None
-            if hasattr(ak, 'fund_open_fund_info_em'):
-                df = ak.fund_open_fund_info_em(symbol=fund_code, indicator="基金持仓")
-            elif hasattr(ak, 'fund_em_open_fund_info'):
-                df = ak.fund_em_open_fund_info(fund=fund_code, indicator="基金持仓")
-            else:
-                return None
+            df = self._fetch_open_fund_info(fund_code, "基金持仓", 'holdings')
+        except Exception as e:
+            logger.error(f"获取基金 {fund_code} 持仓数据失败: {e}")
+            return None
+        
+        return self.get_fund_holdings_from(df, fund_code)
+    
+    def get_fund_holdings_from(self, df: Optional[pd.DataFrame], fund_code: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        从 AkShare "基金持仓" 原始数据解析持仓
+        
+        Args:
+            df: AkShare 返回的原始 DataFrame（可来自 prefetch）
+            fund_code: 基金代码
             
+        Returns:
+            持仓列表
+        """
+        try:
             if df is None or df.empty:
                 logger.warning(f"未找到基金 {fund_code} 的持仓数据")
                 return None
             
-            holdings = []
-            for _, row in df.iterrows():
-                holdings.append({
-                    'stock_code': row.get('股票代码', ''),
-                    'stock_name': row.get('股票名称', ''),
-                    'ratio': row.get('持仓占比', 0),
-                })
-                
-            return holdings[:10]  # 返回前10大持仓
+            # 取前10大持仓，缺失的列按默认值补齐
+            top = df.head(10)
+            if _IS_PYPY:
+                return _parse_holding_records(top.to_dict('records'))
+            missing = {col: default for col, default in HOLDING_DEFAULTS.items() if col not in top.columns}
+            top = top.assign(**missing)[list(HOLDING_COLUMNS)].rename(columns=HOLDING_COLUMNS)
+            return top.to_dict(orient='records')
             
         except Exception as e:
             logger.error(f"获取基金 {fund_code} 持仓数据失败: {e}")
             return None
     
-    def get_realtime_data(self, fund_code: str) -> Optional[Dict[str, Any]]:
+    def get_realtime_data(self, fund_code: str, info: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         获取基金实时数据
         
         Args:
             fund_code: 基金代码
+            info: 调用方已获取的基金基本信息，无实时数据时直接用于回退，不再重复查询
             
         Returns:
             实时数据字典
         """
+        if self._ak() is None:
+            logger.error("AkShare 未安装")
+            return None
+        
         try:
-            if ak is None:
-                logger.error("AkShare 未安装")
-                return None
-            
             # 获取基金实时数据
-            # 兼容新旧接口
-            df = None
-            if hasattr(ak, 'fund_open_fund_info_em'):
-                df = ak.fund_open_fund_info_em(symbol=fund_code, indicator="实时估值")
-            elif hasattr(ak, 'fund_em_open_fund_info'):
-                df = ak.fund_em_open_fund_info(fund=fund_code, indicator="实时估值")
-            else:
-                return None
+            df = self._fetch_open_fund_info(fund_code, "实时估值", 'realtime')
+        except Exception as e:
+            logger.error(f"获取基金 {fund_code} 实时数据失败: {e}")
+            return None
+        
+        return self.get_realtime_data_from(df, fund_code, info)
+    
+    def get_realtime_data_from(
+        self, df: Optional[pd.DataFrame], fund_code: str, info: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        从 AkShare "实时估值" 原始数据解析实时数据
+        
+        Args:
+            df: AkShare 返回的原始 DataFrame（可来自 prefetch）
+            fund_code: 基金代码
+            info: 调用方已获取的基金基本信息，未提供时才调用 get_fund_info
             
+        Returns:
+            实时数据字典
+        """
+        try:
             if df is None or df.empty:
-                # 如果没有实时数据，返回基本信息
-                info = self.get_fund_info(fund_code)
+                # 如果没有实时数据，返回基本信息（优先使用调用方传入的）
+                if info is None:
+                    info = self.get_fund_info(fund_code)
                 if info:
                     return {
                         'code': fund_code,
@@ -307,14 +1021,14 @@ class FundDataFetcher:
                     }
                 return None
             
-            latest = df.iloc[-1]
-            
+            # 直接按列取最后一个标量，不为最后一行构造 Series
+            columns = df.columns
             return {
                 'code': fund_code,
-                'name': latest.get('基金名称', ''),
-                'current': float(latest.get('估算净值', 0)),
+                'name': df['基金名称'].iat[-1] if '基金名称' in columns else '',
+                'current': float(df['估算净值'].iat[-1]) if '估算净值' in columns else 0.0,
                 'change': 0,
-                'change_pct': float(latest.get('估算增长率', 0)),
+                'change_pct': float(df['估算增长率'].iat[-1]) if '估算增长率' in columns else 0.0,
             }
             
         except Exception as e:
@@ -358,5 +1072,5 @@ if __name__ == "__main__":
         print(f"\n前3大持仓: {holdings[:3]}")
     
     # 5. 实时数据
-    realtime = fetcher.get_realtime_data(test_code)
+    realtime = fetcher.get_realtime_data(test_code, info=info)
     print(f"\n实时数据: {realtime}")
@@ -235,11 +235,14 @@ def run_full_analysis(
         )
         
         # 1. 运行个基分析
-        results = pipeline.run(
-            fund_codes=fund_codes,
-            dry_run=args.dry_run,
-            send_notification=not args.no_notify
-        )
+        try:
+            results = pipeline.run(
+                fund_codes=fund_codes,
+                dry_run=args.dry_run,
+                send_notification=not args.no_notify
+            )
+        finally:
+            pipeline.close()
 
         # Issue #128: 分析间隔 - 在个基分析和市场复盘之间添加延迟
         # analysis_delay = getattr(config, 'analysis_delay', 0)
@@ -260,7 +263,7 @@ def run_full_analysis(
             for r in sorted(results, key=lambda x: x.signal_score, reverse=True):
                 # 简单的控制台输出，r 是 FundAnalysisResult 对象
                 logger.info(
-                    f"{r.name}({r.code}): {r.buy_signal.value} | "
+                    f"{r.name}({r.code}): {r.buy_signal.label} | "
                     f"评分 {r.signal_score} | {r.entry_timing}"
                 )
         
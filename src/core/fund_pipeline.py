@@ -9,14 +9,19 @@
 2. 协调数据获取、分析、通知等模块
 """
 
+import heapq
 import logging
+import time
 import concurrent.futures
 from typing import List, Optional, Dict, Any
 
+import pandas as pd
+
 from src.config import Config
 from src.notification import NotificationService
 from data_provider.fund_fetcher import FundDataFetcher
 from src.fund_analyzer import FundTrendAnalyzer, FundAnalysisResult, BuySignal
+from src import indicators
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +35,25 @@ class FundAnalysisPipeline:
     ):
         self.config = config or Config.get_instance()
         self.max_workers = max_workers or self.config.max_workers
-        self.fetcher = FundDataFetcher()
+        # prefetch 线程池与分析线程池同样大小，发往 AkShare 的并发不超过 max_workers
+        self.fetcher = FundDataFetcher(prefetch_workers=self.max_workers)
         self.analyzer = FundTrendAnalyzer()
         self.notifier = NotificationService(self.config)
         
-    def process_single_fund(self, code: str) -> Optional[FundAnalysisResult]:
-        """处理单只基金"""
+        # 流水线级线程池：多次 run（定时任务）复用同一组线程
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='fund-fetch'
+        )
+        
+    def process_single_fund(self, code: str, nav_raw: Optional[pd.DataFrame] = None) -> Optional[FundAnalysisResult]:
+        """
+        处理单只基金
+        
+        Args:
+            code: 基金代码
+            nav_raw: 已批量预取的原始净值数据，为空时通过 AkShare 获取
+        """
         try:
             logger.info(f"开始分析基金: {code}")
             
@@ -48,24 +66,31 @@ class FundAnalysisPipeline:
             name = info.get('name', code)
             logger.info(f"获取到基金信息: {name}({code})")
             
-            # 2. 获取净值数据
-            nav_df = self.fetcher.get_fund_nav(code, days=120)
+            # 2. 并发预取净值与业绩原始数据，避免逐个串行请求
+            if nav_raw is not None:
+                raw = self.fetcher.prefetch(code, indicators=['perf'])
+                raw['nav'] = nav_raw
+            else:
+                raw = self.fetcher.prefetch(code, indicators=['nav', 'perf'])
+            
+            # 3. 解析净值数据
+            nav_df = self.fetcher.get_fund_nav_from(raw['nav'], code, days=120)
             if nav_df is None or nav_df.empty:
                 logger.warning(f"基金 {name}({code}) 净值数据为空")
                 return None
                 
-            # 3. 获取业绩数据
-            performance = self.fetcher.get_fund_performance(code)
+            # 4. 解析业绩数据
+            performance = self.fetcher.get_fund_performance_from(raw['perf'], code)
             
-            # 4. 执行分析
+            # 5. 执行分析
             result = self.analyzer.analyze(
-                df=nav_df,
+                data=nav_df,
                 code=code,
                 name=name,
                 performance=performance
             )
             
-            # 5. 单只推送（如果启用）
+            # 6. 单只推送（如果启用）
             if self.config.single_stock_notify:
                 self._send_single_notification(result)
                 
@@ -83,6 +108,9 @@ class FundAnalysisPipeline:
     ) -> List[FundAnalysisResult]:
         """运行分析流程"""
         
+        # 整体时限：单个接口卡住时不拖垮整份日报
+        deadline = time.monotonic() + self.config.run_timeout_sec if self.config.run_timeout_sec > 0 else None
+        
         # 1. 确定基金列表
         if not fund_codes:
             fund_codes = self.config.stock_list  # 这里复用配置中的列表，虽然变量名叫stock_list
@@ -91,35 +119,85 @@ class FundAnalysisPipeline:
             logger.warning("没有需要分析的基金")
             return []
             
-        logger.info(f"开始分析任务，共 {len(fund_codes)} 只基金")
-        
-        results = []
+        # 去重（保持原有顺序），多来源合并的列表常有重复代码
+        unique_codes = list(dict.fromkeys(fund_codes))
+        if len(unique_codes) < len(fund_codes):
+            logger.info(f"基金列表中有 {len(fund_codes) - len(unique_codes)} 个重复代码，已去重")
+            
+        logger.info(f"开始分析任务，共 {len(unique_codes)} 只基金")
         
         # 2. 并发执行分析
         if dry_run:
             logger.info("Dry run 模式，跳过实际分析")
             return []
             
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_code = {
-                executor.submit(self.process_single_fund, code): code 
-                for code in fund_codes
-            }
+        # 提前导入 numba 并编译/加载均线计算内核，不占用第一只基金的分析时间
+        # （放在 dry-run 判断之后，dry-run 不承担这部分开销）
+        indicators.warmup()
+        
+        # 净值走 JSON 接口批量异步获取，失败的基金在线程内回退到 AkShare
+        nav_map = self.fetcher.prefetch_nav_batch(unique_codes, days=120)
+        
+        by_code: Dict[str, FundAnalysisResult] = {}
+        
+        # 滑动窗口提交：在途任务不超过 2 倍线程数，长列表也不会一次性堆满队列
+        code_iter = iter(unique_codes)
+        pending: Dict[concurrent.futures.Future, str] = {}
+        
+        def submit_next() -> None:
+            code = next(code_iter, None)
+            if code is not None:
+                pending[self._executor.submit(self.process_single_fund, code, nav_map.get(code))] = code
+        
+        for _ in range(2 * self.max_workers):
+            submit_next()
+        
+        while pending:
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            done, _ = concurrent.futures.wait(
+                pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                # 超时：取消在途任务，剩余基金不再提交，直接使用已完成的结果
+                unfinished = list(pending.values()) + list(code_iter)
+                for future in pending:
+                    future.cancel()
+                logger.warning(
+                    f"分析超时（{self.config.run_timeout_sec:.0f}s），"
+                    f"放弃未完成的 {len(unfinished)} 只基金: {', '.join(unfinished)}"
+                )
+                break
             
-            for future in concurrent.futures.as_completed(future_to_code):
+            for future in done:
+                code = pending.pop(future)
                 try:
                     result = future.result()
                     if result:
-                        results.append(result)
+                        by_code[code] = result
                 except Exception as e:
                     logger.error(f"任务执行异常: {e}")
-                    
+                submit_next()
+        
+        # 按输入顺序整理结果
+        results = [by_code[code] for code in unique_codes if code in by_code]
+        
         # 3. 汇总推送
         if send_notification and results and not self.config.single_stock_notify:
             self._send_summary_notification(results)
             
         return results
 
+    def close(self, wait: bool = False) -> None:
+        """
+        关闭线程池和数据获取器的网络连接，流水线不再使用时调用
+        
+        Args:
+            wait: 是否等待在途任务结束。默认不等待并取消排队中的任务，
+                run 超时后卡住的接口调用不会再阻塞调用方
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.fetcher.close()
+
     def _send_single_notification(self, result: FundAnalysisResult):
         """发送单只基金通知"""
         content = self.analyzer.format_analysis(result)
@@ -133,24 +211,29 @@ class FundAnalysisPipeline:
             
         # 统计信息
         total = len(results)
-        buy = sum(1 for r in results if r.buy_signal in [BuySignal.BUY, BuySignal.STRONG_BUY])
-        wait = sum(1 for r in results if r.buy_signal in [BuySignal.WAIT, BuySignal.HOLD])
-        sell = sum(1 for r in results if r.buy_signal in [BuySignal.SELL, BuySignal.STRONG_SELL])
+        buy = sum(1 for r in results if r.buy_signal >= BuySignal.BUY)
+        sell = sum(1 for r in results if r.buy_signal <= BuySignal.SELL)
+        wait = total - buy - sell  # 继续持有 / 观望等待
         
-        # 构建消息头
-        msg = [
-            f"📊 {self.config.today_date_str if hasattr(self.config, 'today_date_str') else ''} 决策仪表盘",
-            f"{total}只基金 | 🟢买入:{buy} 🟡观望:{wait} 🔴卖出:{sell}",
-            ""
-        ]
+        # 按评分排序，优先展示推荐的；只展示前 N 只时用堆取 Top-N，无需全量排序
+        top_k = self.config.summary_top_k
+        if 0 < top_k < total:
+            sorted_results = heapq.nlargest(top_k, results, key=lambda x: x.signal_score)
+        else:
+            sorted_results = sorted(results, key=lambda x: x.signal_score, reverse=True)
         
-        # 按评分排序，优先展示推荐的
-        sorted_results = sorted(results, key=lambda x: x.signal_score, reverse=True)
+        # 消息总行数已知（3 行消息头 + 每只基金简报与分隔符），预先分配
+        msg: List[Optional[str]] = [None] * (3 + 2 * len(sorted_results))
+        
+        # 构建消息头
+        msg[0] = f"📊 {self.config.today_date_str if hasattr(self.config, 'today_date_str') else ''} 决策仪表盘"
+        msg[1] = f"{total}只基金 | 🟢买入:{buy} 🟡观望:{wait} 🔴卖出:{sell}"
+        msg[2] = f"（仅展示评分最高的 {len(sorted_results)} 只）\n" if len(sorted_results) < total else ""
         
-        for res in sorted_results:
+        for i, res in enumerate(sorted_results):
             # 格式化每只基金的简报
-            msg.append(self.analyzer.format_analysis(res))
-            msg.append("---") # 分隔符
+            msg[3 + 2 * i] = self.analyzer.format_analysis(res)
+            msg[4 + 2 * i] = "---"  # 分隔符
             
         full_content = "\n".join(msg)
         
@@ -17,41 +17,120 @@
 4. 基金经理：稳定性和历史业绩
 """
 
+import bisect
 import logging
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Tuple
-from enum import Enum
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+from operator import attrgetter
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, Union
+from enum import IntEnum, IntFlag
 
-import pandas as pd
 import numpy as np
 
+# pandas 只用于类型标注：分析器按鸭子类型读取 DataFrame，
+# 只传 NumPy 数组的调用方（如短生命周期的批处理进程）无需承担 pandas 的导入开销
+if TYPE_CHECKING:
+    import pandas as pd
+
+from src import indicators
+from src.indicators import batch_scores, ma_series, tail_mas
+
 logger = logging.getLogger(__name__)
 
 
-class TrendStatus(Enum):
-    """趋势状态枚举"""
-    STRONG_BULL = "强势上涨"
-    BULL = "稳健上涨"
-    WEAK_BULL = "弱势上涨"
-    CONSOLIDATION = "震荡整理"
-    WEAK_BEAR = "弱势下跌"
-    BEAR = "持续下跌"
-    STRONG_BEAR = "强势下跌"
+class _LabeledIntEnum(IntEnum):
+    """带中文描述的整数枚举：比较按整数进行，展示时使用 label"""
+    
+    def __new__(cls, value: int, label: str):
+        obj = int.__new__(cls, value)
+        obj._value_ = value
+        obj.label = label
+        return obj
+
+
+class TrendStatus(_LabeledIntEnum):
+    """趋势状态枚举（整数值即趋势强度，越大越强）"""
+    STRONG_BULL = 3, "强势上涨"
+    BULL = 2, "稳健上涨"
+    WEAK_BULL = 1, "弱势上涨"
+    CONSOLIDATION = 0, "震荡整理"
+    WEAK_BEAR = -1, "弱势下跌"
+    BEAR = -2, "持续下跌"
+    STRONG_BEAR = -3, "强势下跌"
+
+
+class BuySignal(_LabeledIntEnum):
+    """投资建议枚举（整数值越大越看多）"""
+    STRONG_BUY = 3, "强烈推荐"
+    BUY = 2, "适合买入"
+    HOLD = 1, "继续持有"
+    WAIT = -1, "观望等待"
+    SELL = -2, "考虑卖出"
+    STRONG_SELL = -3, "强烈卖出"
+
+
+# 趋势状态对应的评分，按 TrendStatus + 3 索引（STRONG_BEAR .. STRONG_BULL）
+_TREND_SCORE = (-2, -2, 0, 0, 1, 2, 2)
+
+# 综合评分 -> 投资建议，按 score + _SCORE_OFFSET 索引（超出范围时截断到两端）
+_SCORE_OFFSET = 6
+_SCORE_TO_SIGNAL: Tuple[BuySignal, ...] = (
+    (BuySignal.STRONG_SELL,) * 2    # <= -5
+    + (BuySignal.SELL,) * 2         # -4, -3
+    + (BuySignal.WAIT,) * 2         # -2, -1
+    + (BuySignal.HOLD,) * 2         # 0, 1
+    + (BuySignal.BUY,) * 2          # 2, 3
+    + (BuySignal.STRONG_BUY,) * 3   # >= 4
+)
+
+
+class ReasonFlag(IntFlag):
+    """评分理由/风险位标志（取值与 indicators 中的批量内核一致）"""
+    TREND_UP = indicators.REASON_TREND_UP
+    WEAK_UP = indicators.REASON_WEAK_UP
+    SIDEWAYS = indicators.REASON_SIDEWAYS
+    PULLBACK_BUY = indicators.REASON_PULLBACK_BUY
+    NEAR_MA = indicators.REASON_NEAR_MA
+    YEAR_EXCELLENT = indicators.REASON_YEAR_EXCELLENT
+    YEAR_GOOD = indicators.REASON_YEAR_GOOD
+    TREND_DOWN = indicators.RISK_TREND_DOWN
+    CHASE_HIGH = indicators.RISK_CHASE_HIGH
+    OFF_MA = indicators.RISK_OFF_MA
+    YEAR_NEGATIVE = indicators.RISK_YEAR_NEGATIVE
+    MONTH_SURGE = indicators.RISK_MONTH_SURGE
+    INSUFFICIENT_DATA = indicators.REASON_INSUFFICIENT_DATA
 
 
-class BuySignal(Enum):
-    """投资建议枚举"""
-    STRONG_BUY = "强烈推荐"
-    BUY = "适合买入"
-    HOLD = "继续持有"
-    WAIT = "观望等待"
-    SELL = "考虑卖出"
-    STRONG_SELL = "强烈卖出"
+# 位标志 -> 文本模板，按展示顺序排列；{r} 为分析结果，渲染时才格式化
+_REASON_TEXTS: Tuple[Tuple[ReasonFlag, str], ...] = (
+    (ReasonFlag.INSUFFICIENT_DATA, "⚠️ 数据不足，暂不评估趋势"),
+    (ReasonFlag.TREND_UP, "✅ 趋势向上（{r.trend_status.label}）"),
+    (ReasonFlag.WEAK_UP, "⚠️ 弱势上涨"),
+    (ReasonFlag.SIDEWAYS, "⚠️ 震荡整理"),
+    (ReasonFlag.PULLBACK_BUY, "✅ 回调至买入区域（距MA5: {r.pullback_from_ma5:.1f}%）"),
+    (ReasonFlag.NEAR_MA, "✅ 接近均线支撑"),
+    (ReasonFlag.YEAR_EXCELLENT, "✅ 年度收益优秀（{r.year_1_return:.1f}%）"),
+    (ReasonFlag.YEAR_GOOD, "✅ 年度收益良好（{r.year_1_return:.1f}%）"),
+)
+_RISK_TEXTS: Tuple[Tuple[ReasonFlag, str], ...] = (
+    (ReasonFlag.TREND_DOWN, "❌ 趋势向下（{r.trend_status.label}）"),
+    (ReasonFlag.CHASE_HIGH, "❌ 严禁追高（距MA5: +{r.pullback_from_ma5:.1f}%）"),
+    (ReasonFlag.OFF_MA, "⚠️ 偏离均线，建议等待"),
+    (ReasonFlag.YEAR_NEGATIVE, "⚠️ 年度收益为负（{r.year_1_return:.1f}%）"),
+    (ReasonFlag.MONTH_SURGE, "⚠️ 近1月涨幅过大（{r.month_1_return:.1f}%），存在回调风险"),
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class FundAnalysisResult:
-    """基金分析结果"""
+    """
+    基金分析结果
+    
+    使用 __slots__，批量分析时每个实例不再携带 __dict__；
+    理由/风险只记录为 reason_flags 位标志，signal_reasons/risk_factors
+    在读取时才渲染成文本。
+    """
     code: str
     name: str = ""
     
@@ -79,42 +158,66 @@ class FundAnalysisResult:
     # 投资建议
     buy_signal: BuySignal = BuySignal.WAIT
     signal_score: int = 0
-    signal_reasons: List[str] = field(default_factory=list)
-    risk_factors: List[str] = field(default_factory=list)
+    reason_flags: int = 0  # ReasonFlag 位标志
     
     # 操作建议
     entry_timing: str = ""  # 买入时机
     stop_loss: str = ""  # 止损建议
     target_return: str = ""  # 目标收益
     
+    @property
+    def signal_reasons(self) -> List[str]:
+        """投资理由文本（由 reason_flags 渲染）"""
+        flags = self.reason_flags
+        return [text.format(r=self) for flag, text in _REASON_TEXTS if flags & flag]
+    
+    @property
+    def risk_factors(self) -> List[str]:
+        """风险因素文本（由 reason_flags 渲染）"""
+        flags = self.reason_flags
+        return [text.format(r=self) for flag, text in _RISK_TEXTS if flags & flag]
+    
+    def copy(self) -> 'FundAnalysisResult':
+        """复制结果（各字段均为不可变值，浅复制即可）"""
+        return replace(self)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'code': self.code,
-            'name': self.name,
-            'trend_status': self.trend_status.value,
-            'trend_strength': self.trend_strength,
-            'ma5': self.ma5,
-            'ma10': self.ma10,
-            'ma20': self.ma20,
-            'ma60': self.ma60,
-            'current_nav': self.current_nav,
-            'pullback_from_ma5': self.pullback_from_ma5,
-            'pullback_from_ma20': self.pullback_from_ma20,
-            'pullback_status': self.pullback_status,
-            'week_1_return': self.week_1_return,
-            'month_1_return': self.month_1_return,
-            'month_3_return': self.month_3_return,
-            'month_6_return': self.month_6_return,
-            'year_1_return': self.year_1_return,
-            'buy_signal': self.buy_signal.value,
-            'signal_score': self.signal_score,
-            'signal_reasons': self.signal_reasons,
-            'risk_factors': self.risk_factors,
-            'entry_timing': self.entry_timing,
-            'stop_loss': self.stop_loss,
-            'target_return': self.target_return,
-        }
+        """转换为字典（键顺序见 RESULT_FIELDS，枚举转为中文描述，理由/风险渲染为文本）"""
+        return dict(zip(RESULT_FIELDS, self.to_tuple()))
+    
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """
+        转换为元组，字段顺序见 RESULT_FIELDS
+        
+        批量导出（CSV 等）时使用，跳过逐个构造字典。
+        """
+        values = list(_get_result_fields(self))
+        values[_TREND_STATUS_POS] = self.trend_status.label
+        values[_BUY_SIGNAL_POS] = self.buy_signal.label
+        return tuple(values)
+
+
+# FundAnalysisResult 的导出列名（to_tuple 的列顺序，可作为导出表头）：
+# reason_flags 展开为渲染后的 signal_reasons/risk_factors 两列
+RESULT_FIELDS: Tuple[str, ...] = tuple(
+    name
+    for f in fields(FundAnalysisResult)
+    for name in (('signal_reasons', 'risk_factors') if f.name == 'reason_flags' else (f.name,))
+)
+_get_result_fields = attrgetter(*RESULT_FIELDS)
+_TREND_STATUS_POS = RESULT_FIELDS.index('trend_status')
+_BUY_SIGNAL_POS = RESULT_FIELDS.index('buy_signal')
+
+
+# 投资建议 -> 报告标题前的信号灯
+_SIGNAL_EMOJI: Dict[BuySignal, str] = {
+    BuySignal.STRONG_BUY: "🟢",
+    BuySignal.BUY: "🟢",
+    BuySignal.HOLD: "🟡",
+    BuySignal.WAIT: "🟡",
+    BuySignal.SELL: "🔴",
+    BuySignal.STRONG_SELL: "🔴",
+}
 
 
 class FundTrendAnalyzer:
@@ -132,18 +235,42 @@ class FundTrendAnalyzer:
     CHASE_HIGH_THRESHOLD = 10.0  # 短期涨幅超过10%视为追高
     PULLBACK_BUY_THRESHOLD = -3.0  # 回调3%以内为买入区域
     STRONG_PULLBACK_THRESHOLD = -8.0  # 回调超过8%为大幅回调
+    MIN_NAV_POINTS = 5  # 净值少于5个时均线无意义，不做趋势分析
+    NAV_DECIMALS = 4  # 净值公布精度（小数位数）
+    
+    # 回调状态：距 MA5 的幅度按分界点（左开右闭区间）落入的档位，从低到高排列
+    PULLBACK_BOUNDS = (PULLBACK_BUY_THRESHOLD, 0.0, 5.0, CHASE_HIGH_THRESHOLD)
+    PULLBACK_STATUSES = (
+        "大幅回调，关注支撑",          # <= -3%
+        "回调至均线附近，买入时机",    # (-3%, 0]
+        "接近均线，可以关注",          # (0, 5%]
+        "偏离均线，建议等待回调",      # (5%, 10%]
+        "严重偏离均线，追高风险",      # > 10%
+    )
+    
+    # 分析结果缓存条数（LRU）
+    RESULT_CACHE_SIZE = 4096
     
     def __init__(self):
         """初始化分析器"""
-        logger.info("初始化基金趋势分析器")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("初始化基金趋势分析器")
+        # 同一会话内重复分析同一只基金（如刷新）时，输入不变则直接复用结果
+        self._result_cache: 'OrderedDict[tuple, FundAnalysisResult]' = OrderedDict()
+        self._result_cache_lock = threading.Lock()
     
-    def analyze(self, df: pd.DataFrame, code: str, name: str = "", 
+    def analyze(self, data: Union['pd.DataFrame', np.ndarray, Tuple[np.ndarray, np.ndarray]],
+                code: str, name: str = "",
                 performance: Optional[Dict[str, float]] = None) -> FundAnalysisResult:
         """
         分析基金趋势
         
         Args:
-            df: 包含净值数据的 DataFrame (必须有 date, nav 列)
+            data: 净值数据，支持三种形式：
+                - 包含 date, nav 列的 DataFrame
+                - (日期数组, 净值数组) 元组
+                - 按日期升序的净值数组
+                已有 NumPy 数组的调用方无需先包装成 DataFrame
             code: 基金代码
             name: 基金名称
             performance: 业绩数据字典
@@ -151,32 +278,39 @@ class FundTrendAnalyzer:
         Returns:
             FundAnalysisResult 分析结果
         """
-        if df is None or df.empty:
+        _, nav = self._unpack_navs(data)
+        if nav is None or len(nav) == 0:
             logger.warning(f"基金 {code} 数据为空")
             return FundAnalysisResult(code=code, name=name)
-        
-        # 确保数据按日期排序
-        df = df.sort_values('date', ascending=True).copy()
+        if len(nav) < self.MIN_NAV_POINTS:
+            return self._insufficient_data_result(code, name, nav, performance)
+        
+        # 缓存键取最近 60 个净值的字节（分析只用到这部分：最长均线为 MA60），
+        # 不对整列求哈希；只传净值数组（无日期）时也能区分不同的走势
+        key = (
+            code, name, nav[-60:].tobytes(),
+            tuple(sorted(performance.items())) if performance else None,
+        )
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+                return cached.copy()
         
         # 初始化结果
         result = FundAnalysisResult(code=code, name=name)
         
-        # 计算均线
-        self._calculate_mas(df)
+        # 计算均线（只需要最新值）
+        mas = self._calculate_mas(nav)
         
         # 分析趋势
-        self._analyze_trend(df, result)
+        self._analyze_trend(nav, mas, result)
         
         # 分析回调
-        self._analyze_pullback(df, result)
+        self._analyze_pullback(result)
         
         # 添加收益数据
-        if performance:
-            result.week_1_return = performance.get('week_1', 0)
-            result.month_1_return = performance.get('month_1', 0)
-            result.month_3_return = performance.get('month_3', 0)
-            result.month_6_return = performance.get('month_6', 0)
-            result.year_1_return = performance.get('year_1', 0)
+        self._apply_performance(result, performance)
         
         # 生成投资建议
         self._generate_signal(result)
@@ -184,60 +318,210 @@ class FundTrendAnalyzer:
         # 生成操作建议
         self._generate_operation_advice(result)
         
+        # 计算按 float32 净值进行（与批量内核一致），输出时还原为公布的 4 位小数，去掉 float32 噪声
+        result.current_nav = round(result.current_nav, self.NAV_DECIMALS)
+        
+        with self._result_cache_lock:
+            self._result_cache[key] = result
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result.copy()
+    
+    def compute_ma_series(
+        self,
+        data: Union['pd.DataFrame', np.ndarray, Tuple[np.ndarray, np.ndarray]],
+        windows: Tuple[int, ...] = (5, 10, 20, 60)
+    ) -> Dict[int, np.ndarray]:
+        """
+        计算完整的均线序列（供绘图等需要整条均线的场景）
+        
+        analyze 只需要最新一日的均线，不会调用这里。
+        
+        Args:
+            data: 净值数据，形式同 analyze
+            windows: 窗口长度
+            
+        Returns:
+            {窗口长度: 按日期升序、与净值等长的均线序列}，无数据时返回空字典
+        """
+        _, nav = self._unpack_navs(data)
+        if nav is None or len(nav) == 0:
+            return {}
+        return ma_series(nav, windows)
+    
+    @staticmethod
+    def _unpack_navs(data: Any) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        将 analyze 的输入统一为按日期升序的 (日期数组, float32 净值数组)
+        
+        日期已升序时（fetcher 返回的数据通常如此）不排序也不复制；
+        只传净值数组时视为已升序，日期返回 None。
+        净值只有 4 位小数，统一为 float32（fetcher 返回的已是 float32，无需复制），
+        均线等累加在内核中以 float64 进行。
+        """
+        if data is None:
+            return None, None
+        if hasattr(data, 'columns'):  # DataFrame
+            if len(data) == 0:
+                return None, None
+            dates, nav = data['date'].to_numpy(), data['nav'].to_numpy()
+        elif isinstance(data, tuple):
+            dates, nav = np.asarray(data[0]), np.asarray(data[1])
+        else:
+            return None, np.asarray(data).astype(np.float32, copy=False)
+        
+        nav = nav.astype(np.float32, copy=False)
+        if len(dates) > 1 and (dates[1:] < dates[:-1]).any():
+            order = np.argsort(dates, kind='mergesort')
+            dates, nav = dates[order], nav[order]
+        return dates, nav
+    
+    def analyze_batch(
+        self,
+        items: List[Tuple[str, str, np.ndarray, Optional[Dict[str, float]]]]
+    ) -> List[FundAnalysisResult]:
+        """
+        批量分析多只基金
+        
+        把各基金最近 60 个净值按右对齐堆成 (N, 60) 的二维数组（不足的用 NaN 补齐），
+        均线、趋势强度、回调幅度、评分和理由位标志由 indicators.batch_scores 一次算出
+        （安装 numba 时按基金并行），最后逐只填入结果对象。
+        结果与逐只调用 analyze 一致。
+        
+        Args:
+            items: [(基金代码, 基金名称, 按日期升序的净值数组, 业绩数据字典), ...]
+            
+        Returns:
+            与 items 顺序一致的 FundAnalysisResult 列表
+        """
+        results = [FundAnalysisResult(code=code, name=name) for code, name, _, _ in items]
+        idx = []
+        for i, (code, name, nav, perf) in enumerate(items):
+            if nav is None or len(nav) == 0:
+                logger.warning(f"基金 {code} 数据为空")
+            elif len(nav) < self.MIN_NAV_POINTS:
+                # 与 analyze 一样先转为 float32，结果逐位一致
+                results[i] = self._insufficient_data_result(code, name, np.asarray(nav, dtype=np.float32), perf)
+            else:
+                idx.append(i)
+        if not idx:
+            return results
+        
+        navs = np.full((len(idx), 60), np.nan, dtype=np.float32)
+        for row, i in enumerate(idx):
+            tail = np.asarray(items[i][2])[-60:]
+            navs[row, 60 - len(tail):] = tail
+        
+        perfs = [items[i][3] or {} for i in idx]
+        year_1 = np.array([perf.get('year_1', 0) for perf in perfs], dtype=np.float64)
+        month_1 = np.array([perf.get('month_1', 0) for perf in perfs], dtype=np.float64)
+        ma5, ma10, ma20, ma60, current, strength, pb5, pb20, scores, flags = batch_scores(
+            navs, year_1, month_1, self.CHASE_HIGH_THRESHOLD, self.PULLBACK_BUY_THRESHOLD
+        )
+        
+        # 回调状态：与 _analyze_pullback 一致，一次 searchsorted 得到全部档位
+        status_idx = np.searchsorted(self.PULLBACK_BOUNDS, pb5, side='left')
+        status_idx[np.isnan(pb5)] = 0
+        
+        for row, i in enumerate(idx):
+            result = results[i]
+            result.current_nav = round(float(current[row]), self.NAV_DECIMALS)
+            result.ma5, result.ma10 = float(ma5[row]), float(ma10[row])
+            result.ma20, result.ma60 = float(ma20[row]), float(ma60[row])
+            result.trend_status = TrendStatus(int(strength[row]))
+            result.trend_strength = float(result.trend_status)
+            result.pullback_from_ma5 = float(pb5[row])
+            result.pullback_from_ma20 = float(pb20[row])
+            result.pullback_status = self.PULLBACK_STATUSES[status_idx[row]]
+            
+            self._apply_performance(result, items[i][3])
+            result.signal_score = int(scores[row])
+            result.reason_flags = int(flags[row])
+            pos = min(max(result.signal_score + _SCORE_OFFSET, 0), len(_SCORE_TO_SIGNAL) - 1)
+            result.buy_signal = _SCORE_TO_SIGNAL[pos]
+            self._generate_operation_advice(result)
+        
+        return results
+    
+    def _insufficient_data_result(
+        self, code: str, name: str, nav: np.ndarray, performance: Optional[Dict[str, float]] = None
+    ) -> FundAnalysisResult:
+        """
+        净值太少（新发基金或数据不完整）时直接给出观望结果，跳过评分
+        
+        均线和回调幅度仍按已有净值计算（不足 5 个时各条均线均为全部净值的均值），
+        报告和导出中展示实际数值而不是 0；回调状态标为 "数据不足"。阶段收益照常填入。
+        """
+        result = FundAnalysisResult(code=code, name=name)
+        self._analyze_trend(nav, self._calculate_mas(nav), result)
+        self._analyze_pullback(result)
+        result.pullback_status = "数据不足"
+        self._apply_performance(result, performance)
+        result.current_nav = round(result.current_nav, self.NAV_DECIMALS)
+        result.buy_signal = BuySignal.WAIT
+        result.signal_score = 0
+        result.reason_flags = ReasonFlag.INSUFFICIENT_DATA
+        self._generate_operation_advice(result)
         return result
     
-    def _calculate_mas(self, df: pd.DataFrame) -> None:
-        """计算均线"""
-        df['MA5'] = df['nav'].rolling(window=5, min_periods=1).mean()
-        df['MA10'] = df['nav'].rolling(window=10, min_periods=1).mean()
-        df['MA20'] = df['nav'].rolling(window=20, min_periods=1).mean()
-        df['MA60'] = df['nav'].rolling(window=60, min_periods=1).mean()
+    @staticmethod
+    def _apply_performance(result: FundAnalysisResult, performance: Optional[Dict[str, float]]) -> None:
+        """填入阶段收益数据"""
+        if performance:
+            result.week_1_return = performance.get('week_1', 0)
+            result.month_1_return = performance.get('month_1', 0)
+            result.month_3_return = performance.get('month_3', 0)
+            result.month_6_return = performance.get('month_6', 0)
+            result.year_1_return = performance.get('year_1', 0)
     
-    def _analyze_trend(self, df: pd.DataFrame, result: FundAnalysisResult) -> None:
+    def _calculate_mas(self, nav: np.ndarray) -> Tuple[float, float, float, float]:
+        """
+        计算最新一日的 MA5/MA10/MA20/MA60
+        
+        后续分析只用到最后一天的均线，只对尾部求均值，不再生成整列均线序列
+        （安装 numba 时由 JIT 内核单次遍历完成，否则用 NumPy 切片）。
+        数据不足一个窗口时按已有数据求均值。
+        """
+        return tail_mas(nav)
+    
+    def _analyze_trend(
+        self, nav: np.ndarray, mas: Tuple[float, float, float, float], result: FundAnalysisResult
+    ) -> None:
         """
         分析趋势状态
         
         核心逻辑：判断均线排列和趋势强度
         """
-        latest = df.iloc[-1]
-        
-        result.current_nav = latest['nav']
-        result.ma5 = latest.get('MA5', 0)
-        result.ma10 = latest.get('MA10', 0)
-        result.ma20 = latest.get('MA20', 0)
-        result.ma60 = latest.get('MA60', 0)
+        result.current_nav = float(nav[-1])
+        result.ma5, result.ma10, result.ma20, result.ma60 = mas
         
         # 判断均线排列
         if result.ma5 > result.ma10 > result.ma20:
             # 上升趋势
             if result.current_nav > result.ma5:
                 result.trend_status = TrendStatus.STRONG_BULL
-                result.trend_strength = 3.0
             else:
                 result.trend_status = TrendStatus.BULL
-                result.trend_strength = 2.0
         elif result.ma5 > result.ma10:
             # 弱上升趋势
             result.trend_status = TrendStatus.WEAK_BULL
-            result.trend_strength = 1.0
         elif result.ma5 < result.ma10 < result.ma20:
             # 下降趋势
             if result.current_nav < result.ma5:
                 result.trend_status = TrendStatus.STRONG_BEAR
-                result.trend_strength = -3.0
             else:
                 result.trend_status = TrendStatus.BEAR
-                result.trend_strength = -2.0
         elif result.ma5 < result.ma10:
             # 弱下降趋势
             result.trend_status = TrendStatus.WEAK_BEAR
-            result.trend_strength = -1.0
         else:
             # 震荡整理
             result.trend_status = TrendStatus.CONSOLIDATION
-            result.trend_strength = 0.0
+        
+        # 趋势强度即趋势状态的整数值
+        result.trend_strength = float(result.trend_status)
     
-    def _analyze_pullback(self, df: pd.DataFrame, result: FundAnalysisResult) -> None:
+    def _analyze_pullback(self, result: FundAnalysisResult) -> None:
         """
         分析回调幅度
         
@@ -251,17 +535,9 @@ class FundTrendAnalyzer:
         if result.ma20 > 0:
             result.pullback_from_ma20 = (result.current_nav - result.ma20) / result.ma20 * 100
         
-        # 判断回调状态
-        if result.pullback_from_ma5 > self.CHASE_HIGH_THRESHOLD:
-            result.pullback_status = "严重偏离均线，追高风险"
-        elif result.pullback_from_ma5 > 5.0:
-            result.pullback_status = "偏离均线，建议等待回调"
-        elif result.pullback_from_ma5 > 0:
-            result.pullback_status = "接近均线，可以关注"
-        elif result.pullback_from_ma5 > self.PULLBACK_BUY_THRESHOLD:
-            result.pullback_status = "回调至均线附近，买入时机"
-        else:
-            result.pullback_status = "大幅回调，关注支撑"
+        # 判断回调状态：二分查找所在档位（NaN 落在最低档，与逐级比较一致）
+        pos = bisect.bisect_left(self.PULLBACK_BOUNDS, result.pullback_from_ma5)
+        result.pullback_status = self.PULLBACK_STATUSES[pos]
     
     def _generate_signal(self, result: FundAnalysisResult) -> None:
         """
@@ -271,77 +547,65 @@ class FundTrendAnalyzer:
         - 趋势：上升趋势 +2分，震荡 0分，下降趋势 -2分
         - 回调：回调时机 +2分，接近均线 +1分，追高 -2分
         - 收益：年收益>20% +2分，>10% +1分，<0 -2分
+        
+        理由/风险只记录为位标志，文本在读取 signal_reasons/risk_factors 时才生成。
         """
         score = 0
-        reasons = []
-        risks = []
         
-        # 1. 趋势分析
-        if result.trend_status in [TrendStatus.STRONG_BULL, TrendStatus.BULL]:
-            score += 2
-            reasons.append(f"✅ 趋势向上（{result.trend_status.value}）")
-        elif result.trend_status == TrendStatus.WEAK_BULL:
-            score += 1
-            reasons.append(f"⚠️ 弱势上涨")
-        elif result.trend_status in [TrendStatus.BEAR, TrendStatus.STRONG_BEAR]:
-            score -= 2
-            risks.append(f"❌ 趋势向下（{result.trend_status.value}）")
+        # 1. 趋势分析（评分查表，整数比较代替成员判断）
+        trend = result.trend_status
+        score += _TREND_SCORE[trend + 3]
+        if trend >= TrendStatus.BULL:
+            flags = ReasonFlag.TREND_UP
+        elif trend == TrendStatus.WEAK_BULL:
+            flags = ReasonFlag.WEAK_UP
+        elif trend <= TrendStatus.BEAR:
+            flags = ReasonFlag.TREND_DOWN
         else:
-            reasons.append(f"⚠️ 震荡整理")
+            flags = ReasonFlag.SIDEWAYS
         
         # 2. 回调分析
         if self.PULLBACK_BUY_THRESHOLD <= result.pullback_from_ma5 <= 0:
             score += 2
-            reasons.append(f"✅ 回调至买入区域（距MA5: {result.pullback_from_ma5:.1f}%）")
+            flags |= ReasonFlag.PULLBACK_BUY
         elif 0 < result.pullback_from_ma5 <= 3:
             score += 1
-            reasons.append(f"✅ 接近均线支撑")
+            flags |= ReasonFlag.NEAR_MA
         elif result.pullback_from_ma5 > self.CHASE_HIGH_THRESHOLD:
             score -= 2
-            risks.append(f"❌ 严禁追高（距MA5: +{result.pullback_from_ma5:.1f}%）")
+            flags |= ReasonFlag.CHASE_HIGH
         elif result.pullback_from_ma5 > 5:
             score -= 1
-            risks.append(f"⚠️ 偏离均线，建议等待")
+            flags |= ReasonFlag.OFF_MA
         
         # 3. 收益分析
         if result.year_1_return > 20:
             score += 2
-            reasons.append(f"✅ 年度收益优秀（{result.year_1_return:.1f}%）")
+            flags |= ReasonFlag.YEAR_EXCELLENT
         elif result.year_1_return > 10:
             score += 1
-            reasons.append(f"✅ 年度收益良好（{result.year_1_return:.1f}%）")
+            flags |= ReasonFlag.YEAR_GOOD
         elif result.year_1_return < 0:
             score -= 1
-            risks.append(f"⚠️ 年度收益为负（{result.year_1_return:.1f}%）")
+            flags |= ReasonFlag.YEAR_NEGATIVE
         
         # 4. 短期收益分析（防止追高）
         if result.month_1_return > 15:
             score -= 1
-            risks.append(f"⚠️ 近1月涨幅过大（{result.month_1_return:.1f}%），存在回调风险")
+            flags |= ReasonFlag.MONTH_SURGE
         
         result.signal_score = score
-        result.signal_reasons = reasons
-        result.risk_factors = risks
-        
-        # 生成最终建议
-        if score >= 4:
-            result.buy_signal = BuySignal.STRONG_BUY
-        elif score >= 2:
-            result.buy_signal = BuySignal.BUY
-        elif score >= 0:
-            result.buy_signal = BuySignal.HOLD
-        elif score >= -2:
-            result.buy_signal = BuySignal.WAIT
-        elif score >= -4:
-            result.buy_signal = BuySignal.SELL
-        else:
-            result.buy_signal = BuySignal.STRONG_SELL
+        result.reason_flags = flags
+        
+        # 生成最终建议（查表）
+        pos = min(max(score + _SCORE_OFFSET, 0), len(_SCORE_TO_SIGNAL) - 1)
+        result.buy_signal = _SCORE_TO_SIGNAL[pos]
     
     def _generate_operation_advice(self, result: FundAnalysisResult) -> None:
         """生成操作建议"""
         
         # 买入时机
-        if result.buy_signal in [BuySignal.STRONG_BUY, BuySignal.BUY]:
+        if result.buy_signal >= BuySignal.BUY:
             if result.pullback_from_ma5 < 0:
                 result.entry_timing = "当前位置可以买入，回调后加仓"
             else:
@@ -357,7 +621,7 @@ class FundTrendAnalyzer:
             result.stop_loss = f"跌破{stop_loss_nav:.3f}（MA20下方8%）考虑止损"
         
         # 目标收益
-        if result.buy_signal in [BuySignal.STRONG_BUY, BuySignal.BUY]:
+        if result.buy_signal >= BuySignal.BUY:
             if result.year_1_return > 15:
                 result.target_return = "目标收益 +15% ~ +25%"
             else:
@@ -375,63 +639,60 @@ class FundTrendAnalyzer:
         Returns:
             格式化的分析文本
         """
-        signal_emoji = {
-            BuySignal.STRONG_BUY: "🟢",
-            BuySignal.BUY: "🟢",
-            BuySignal.HOLD: "🟡",
-            BuySignal.WAIT: "🟡",
-            BuySignal.SELL: "🔴",
-            BuySignal.STRONG_SELL: "🔴",
-        }
-        
-        emoji = signal_emoji.get(result.buy_signal, "⚪")
-        
-        lines = [
-            f"{emoji} {result.buy_signal.value} | {result.name}({result.code})",
-            f"",
-            f"📊 净值趋势",
-            f"  当前净值: {result.current_nav:.3f}",
-            f"  趋势状态: {result.trend_status.value}",
-            f"  MA5: {result.ma5:.3f} | MA20: {result.ma20:.3f} | MA60: {result.ma60:.3f}",
-            f"  距离MA5: {result.pullback_from_ma5:+.1f}% | {result.pullback_status}",
-            f"",
-            f"📈 收益表现",
-            f"  近1周: {result.week_1_return:+.1f}% | 近1月: {result.month_1_return:+.1f}%",
-            f"  近3月: {result.month_3_return:+.1f}% | 近6月: {result.month_6_return:+.1f}%",
-            f"  近1年: {result.year_1_return:+.1f}%",
-            f"",
-            f"💡 投资建议（评分: {result.signal_score}）",
-        ]
-        
-        for reason in result.signal_reasons:
-            lines.append(f"  {reason}")
-        
-        if result.risk_factors:
-            lines.append(f"")
-            lines.append(f"⚠️ 风险提示")
-            for risk in result.risk_factors:
-                lines.append(f"  {risk}")
-        
-        lines.extend([
-            f"",
-            f"🎯 操作建议",
-            f"  买入时机: {result.entry_timing}",
-            f"  止损建议: {result.stop_loss}",
-            f"  目标收益: {result.target_return}",
-        ])
-        
-        return "\n".join(lines)
+        r = result
+        emoji = _SIGNAL_EMOJI.get(r.buy_signal, "⚪")
+        
+        # 理由/风险各渲染一次，整段拼接后嵌入模板
+        reasons = r.signal_reasons
+        risks = r.risk_factors
+        reason_block = "\n  " + "\n  ".join(reasons) if reasons else ""
+        risk_block = "\n\n⚠️ 风险提示\n  " + "\n  ".join(risks) if risks else ""
+        
+        return (
+            f"{emoji} {r.buy_signal.label} | {r.name}({r.code})\n"
+            f"\n"
+            f"📊 净值趋势\n"
+            f"  当前净值: {r.current_nav:.3f}\n"
+            f"  趋势状态: {r.trend_status.label}\n"
+            f"  MA5: {r.ma5:.3f} | MA20: {r.ma20:.3f} | MA60: {r.ma60:.3f}\n"
+            f"  距离MA5: {r.pullback_from_ma5:+.1f}% | {r.pullback_status}\n"
+            f"\n"
+            f"📈 收益表现\n"
+            f"  近1周: {r.week_1_return:+.1f}% | 近1月: {r.month_1_return:+.1f}%\n"
+            f"  近3月: {r.month_3_return:+.1f}% | 近6月: {r.month_6_return:+.1f}%\n"
+            f"  近1年: {r.year_1_return:+.1f}%\n"
+            f"\n"
+            f"💡 投资建议（评分: {r.signal_score}）{reason_block}{risk_block}\n"
+            f"\n"
+            f"🎯 操作建议\n"
+            f"  买入时机: {r.entry_timing}\n"
+            f"  止损建议: {r.stop_loss}\n"
+            f"  目标收益: {r.target_return}"
+        )
+
+
+# 模块级默认实例：分析器可在多线程间复用，无需为每只基金各建一个
+_DEFAULT_ANALYZER = FundTrendAnalyzer()
+
+
+def analyze(data: Union['pd.DataFrame', np.ndarray, Tuple[np.ndarray, np.ndarray]],
+            code: str, name: str = "",
+            performance: Optional[Dict[str, float]] = None) -> FundAnalysisResult:
+    """使用默认分析器分析基金趋势，参数同 FundTrendAnalyzer.analyze"""
+    return _DEFAULT_ANALYZER.analyze(data, code, name, performance)
 
 
 if __name__ == "__main__":
     # 测试代码
+    import pandas
+    
     logging.basicConfig(level=logging.INFO)
     
     # 模拟净值数据
-    dates = pd.date_range(end='2024-01-20', periods=120)
+    dates = pandas.date_range(end='2024-01-20', periods=120)
     navs = [1.0 + i * 0.005 + np.random.randn() * 0.01 for i in range(120)]
     
-    df = pd.DataFrame({
+    df = pandas.DataFrame({
         'date': dates,
         'nav': navs,
     })
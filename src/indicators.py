@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+技术指标计算内核
+===================================
+
+职责：
+1. 基于 NumPy 数组计算均线等数值指标，不经过 pandas 对象
+2. 安装了 numba 时以 JIT 编译执行（编译结果缓存到磁盘），否则回退到 NumPy 实现；
+   numba 导入较慢，首次调用内核（或 warmup）时才导入
+3. 批量评分：多只基金的均线、趋势、回调与评分在一个内核中计算，numba 下按基金并行
+
+注意：这里只放纯数值计算，字符串格式化等逻辑保留在分析器中。
+"""
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+# 只检查是否安装；numba 本身在 _load_jit 中按需导入
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+# 批量内核中的并行循环：numba 导入前为普通 range，_load_jit 中替换为 numba.prange
+prange = range
+
+logger = logging.getLogger(__name__)
+
+# 评分理由位标志（fund_analyzer.ReasonFlag 以此定义，文本在分析器中按位渲染）
+REASON_TREND_UP = 1 << 0         # 趋势向上
+REASON_WEAK_UP = 1 << 1          # 弱势上涨
+REASON_SIDEWAYS = 1 << 2         # 震荡整理
+REASON_PULLBACK_BUY = 1 << 3     # 回调至买入区域
+REASON_NEAR_MA = 1 << 4          # 接近均线支撑
+REASON_YEAR_EXCELLENT = 1 << 5   # 年度收益优秀
+REASON_YEAR_GOOD = 1 << 6        # 年度收益良好
+RISK_TREND_DOWN = 1 << 7         # 趋势向下
+RISK_CHASE_HIGH = 1 << 8         # 严禁追高
+RISK_OFF_MA = 1 << 9             # 偏离均线
+RISK_YEAR_NEGATIVE = 1 << 10     # 年度收益为负
+RISK_MONTH_SURGE = 1 << 11       # 近1月涨幅过大
+REASON_INSUFFICIENT_DATA = 1 << 12  # 数据不足（不参与评分）
+
+
+def _prefix_sums(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    有效值的前缀和与前缀个数（长度 n + 1，首元素为 0）
+
+    前缀和以 float64 累加，输入为 float32 时也不会累积精度误差。
+    """
+    n = values.shape[0]
+    valid = ~np.isnan(values)
+    sums = np.zeros(n + 1, dtype=np.float64)
+    counts = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.where(valid, values, 0), dtype=np.float64, out=sums[1:])
+    np.cumsum(valid, out=counts[1:])
+    return sums, counts
+
+
+def _window_means(sums: np.ndarray, counts: np.ndarray, window: int) -> np.ndarray:
+    """由前缀和求各位置的窗口均值：窗口和 = 前缀和之差，窗口未满时按已有数据求均值"""
+    end = np.arange(1, sums.shape[0])
+    start = np.maximum(end - window, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums[end] - sums[start]) / (counts[end] - counts[start])
+
+
+def _tail_mas_kernel(values: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    单次倒序遍历最近 60 个值，同时累加 5/10/20/60 日窗口的和
+
+    NaN 不参与计算，数据不足一个窗口时按已有数据求均值，全为 NaN 时返回 0。
+    """
+    n = values.shape[0]
+    s5 = s10 = s20 = s60 = 0.0
+    c5 = c10 = c20 = c60 = 0
+    for k in range(min(n, 60)):
+        v = values[n - 1 - k]
+        if v == v:  # 非 NaN
+            s60 += v
+            c60 += 1
+            if k < 20:
+                s20 += v
+                c20 += 1
+                if k < 10:
+                    s10 += v
+                    c10 += 1
+                    if k < 5:
+                        s5 += v
+                        c5 += 1
+    return (
+        s5 / c5 if c5 > 0 else 0.0,
+        s10 / c10 if c10 > 0 else 0.0,
+        s20 / c20 if c20 > 0 else 0.0,
+        s60 / c60 if c60 > 0 else 0.0,
+    )
+
+
+def _tail_mean(values: np.ndarray, window: int) -> float:
+    """
+    最近 window 个值的均值（NumPy 切片实现，跳过 NaN，全为 NaN 时返回 0）
+
+    数据不足一个窗口时直接对全部 min(window, n) 个值求均值；
+    只有切片中确实含 NaN 时才做一次过滤，常见情况下不额外分配数组。
+    """
+    n = values.shape[0]
+    tail = values[n - min(window, n):]
+    if np.isnan(tail).any():
+        tail = tail[~np.isnan(tail)]
+    return float(tail.mean(dtype=np.float64)) if tail.size else 0.0
+
+
+def _trend_score_kernel(
+    cur: float, m5: float, m10: float, m20: float, year_1: float, month_1: float,
+    chase_high: float, pullback_buy: float
+) -> Tuple[int, float, float, int, int]:
+    """
+    单只基金的趋势强度、回调幅度、综合评分与理由位标志
+
+    判断顺序与 FundTrendAnalyzer._analyze_trend/_analyze_pullback/_generate_signal 一致。
+
+    Returns:
+        (趋势强度 -3..3, 距 MA5 幅度 %, 距 MA20 幅度 %, 评分, 理由位标志)
+    """
+    if m5 > m10 and m10 > m20:
+        trend = 3 if cur > m5 else 2
+    elif m5 > m10:
+        trend = 1
+    elif m5 < m10 and m10 < m20:
+        trend = -3 if cur < m5 else -2
+    elif m5 < m10:
+        trend = -1
+    else:
+        trend = 0
+
+    pb5 = (cur - m5) / m5 * 100 if m5 > 0 else 0.0
+    pb20 = (cur - m20) / m20 * 100 if m20 > 0 else 0.0
+
+    score = 0
+    if trend >= 2:
+        score += 2
+        flags = REASON_TREND_UP
+    elif trend == 1:
+        score += 1
+        flags = REASON_WEAK_UP
+    elif trend <= -2:
+        score -= 2
+        flags = RISK_TREND_DOWN
+    else:
+        flags = REASON_SIDEWAYS
+
+    if pullback_buy <= pb5 <= 0:
+        score += 2
+        flags |= REASON_PULLBACK_BUY
+    elif 0 < pb5 <= 3:
+        score += 1
+        flags |= REASON_NEAR_MA
+    elif pb5 > chase_high:
+        score -= 2
+        flags |= RISK_CHASE_HIGH
+    elif pb5 > 5:
+        score -= 1
+        flags |= RISK_OFF_MA
+
+    if year_1 > 20:
+        score += 2
+        flags |= REASON_YEAR_EXCELLENT
+    elif year_1 > 10:
+        score += 1
+        flags |= REASON_YEAR_GOOD
+    elif year_1 < 0:
+        score -= 1
+        flags |= RISK_YEAR_NEGATIVE
+
+    if month_1 > 15:
+        score -= 1
+        flags |= RISK_MONTH_SURGE
+    return trend, pb5, pb20, score, flags
+
+
+def _batch_scores_numpy(
+    navs: np.ndarray, year_1: np.ndarray, month_1: np.ndarray, chase_high: float, pullback_buy: float
+) -> Tuple[np.ndarray, ...]:
+    """batch_scores 的 NumPy 实现（未安装 numba 时使用），逐列向量化计算"""
+    n = navs.shape[0]
+    valid = ~np.isnan(navs)
+    # 从最新一天往前逐个累加（与 numba 内核的累加顺序一致），
+    # 窗口内有效值相同时各条均线的结果也完全相同；输入为 float32 时以 float64 累加
+    sums = np.cumsum(np.where(valid, navs, 0)[:, ::-1], axis=1, dtype=np.float64)
+    counts = np.cumsum(valid[:, ::-1], axis=1)
+
+    def tail_mean(window: int) -> np.ndarray:
+        w = min(window, navs.shape[1]) - 1
+        return np.divide(sums[:, w], counts[:, w], out=np.zeros(n), where=counts[:, w] > 0)
+
+    ma5, ma10, ma20, ma60 = tail_mean(5), tail_mean(10), tail_mean(20), tail_mean(60)
+    current = navs[:, -1]
+
+    up = (ma5 > ma10) & (ma10 > ma20)
+    down = (ma5 < ma10) & (ma10 < ma20)
+    trend = np.select(
+        [up & (current > ma5), up, ma5 > ma10, down & (current < ma5), down, ma5 < ma10],
+        [3, 2, 1, -3, -2, -1],
+        default=0,
+    )
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pb5 = np.where(ma5 > 0, (current - ma5) / ma5 * 100, 0.0)
+        pb20 = np.where(ma20 > 0, (current - ma20) / ma20 * 100, 0.0)
+
+    trend_conds = [trend >= 2, trend == 1, trend <= -2]
+    pullback_conds = [(pullback_buy <= pb5) & (pb5 <= 0), (0 < pb5) & (pb5 <= 3), pb5 > chase_high, pb5 > 5]
+    year_conds = [year_1 > 20, year_1 > 10, year_1 < 0]
+    surge = month_1 > 15
+
+    score = np.select(trend_conds, [2, 1, -2], default=0)
+    score += np.select(pullback_conds, [2, 1, -2, -1], default=0)
+    score += np.select(year_conds, [2, 1, -1], default=0)
+    score -= surge.astype(score.dtype)
+
+    flags = np.select(trend_conds, [REASON_TREND_UP, REASON_WEAK_UP, RISK_TREND_DOWN], default=REASON_SIDEWAYS)
+    flags |= np.select(pullback_conds, [REASON_PULLBACK_BUY, REASON_NEAR_MA, RISK_CHASE_HIGH, RISK_OFF_MA], default=0)
+    flags |= np.select(year_conds, [REASON_YEAR_EXCELLENT, REASON_YEAR_GOOD, RISK_YEAR_NEGATIVE], default=0)
+    flags |= np.where(surge, RISK_MONTH_SURGE, 0)
+    return ma5, ma10, ma20, ma60, current, trend, pb5, pb20, score, flags
+
+
+def _batch_scores_kernel(navs, year_1, month_1, chase_high, pullback_buy):
+    """batch_scores 的 numba 实现：各基金相互独立，按基金并行（prange）"""
+    n = navs.shape[0]
+    ma5 = np.empty(n)
+    ma10 = np.empty(n)
+    ma20 = np.empty(n)
+    ma60 = np.empty(n)
+    current = np.empty(n)
+    trend = np.empty(n, dtype=np.int64)
+    pb5 = np.empty(n)
+    pb20 = np.empty(n)
+    score = np.empty(n, dtype=np.int64)
+    flags = np.empty(n, dtype=np.int64)
+    for i in prange(n):
+        m5, m10, m20, m60 = _tail_mas_jit(navs[i])
+        cur = navs[i, navs.shape[1] - 1]
+        t, p5, p20, sc, fl = _trend_score_jit(cur, m5, m10, m20, year_1[i], month_1[i], chase_high, pullback_buy)
+        ma5[i], ma10[i], ma20[i], ma60[i] = m5, m10, m20, m60
+        current[i] = cur
+        trend[i], pb5[i], pb20[i], score[i], flags[i] = t, p5, p20, sc, fl
+    return ma5, ma10, ma20, ma60, current, trend, pb5, pb20, score, flags
+
+
+# JIT 内核，_load_jit 成功后才有值
+_tail_mas_jit = _trend_score_jit = _batch_scores_jit = None
+_jit_lock = threading.Lock()
+
+
+def _load_jit() -> bool:
+    """
+    按需导入 numba 并包装 JIT 内核
+
+    numba 导入约需 170ms，放在模块导入时会抵消延迟导入 pandas 的收益；
+    这里推迟到第一次调用内核（或 warmup）时才导入，只用 NumPy 路径的短生命周期进程不受影响。
+
+    Returns:
+        JIT 内核是否可用（导入失败时同时把 NUMBA_AVAILABLE 置为 False）
+    """
+    global NUMBA_AVAILABLE, prange, _tail_mas_jit, _trend_score_jit, _batch_scores_jit
+    if _batch_scores_jit is not None:
+        return True
+    with _jit_lock:
+        if _batch_scores_jit is None:
+            try:
+                import numba
+            except ImportError:
+                NUMBA_AVAILABLE = False
+                return False
+            prange = numba.prange
+            # 不开启 fastmath：其 nnan 假设会把上面的 NaN 判断优化掉
+            _tail_mas_jit = numba.njit(cache=True)(_tail_mas_kernel)
+            _trend_score_jit = numba.njit(cache=True)(_trend_score_kernel)
+            _batch_scores_jit = numba.njit(parallel=True, cache=True)(_batch_scores_kernel)
+    return True
+
+
+def ma_series(values: np.ndarray, windows: Iterable[int] = (5, 10, 20, 60)) -> Dict[int, np.ndarray]:
+    """
+    一次计算多条完整的均线序列（如绘图需要整条均线时使用）
+
+    只求一次前缀和，各窗口的均线都由前缀和之差得到，
+    不再对每个窗口各扫描一遍序列。NaN 不参与计算，窗口未满时按已有数据求均值，
+    与 pandas rolling(window, min_periods=1).mean() 结果一致。
+
+    Args:
+        values: 净值序列（按日期升序）
+        windows: 窗口长度列表
+
+    Returns:
+        {窗口长度: 与输入等长的均线序列（float64）}
+    """
+    arr = np.asarray(values)
+    if not np.issubdtype(arr.dtype, np.floating):
+        arr = arr.astype(np.float64)
+    sums, counts = _prefix_sums(arr)
+    return {window: _window_means(sums, counts, window) for window in windows}
+
+
+def tail_mas(values: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    最新一日的 MA5/MA10/MA20/MA60
+
+    只需要最后一天的均线时使用，不生成整列序列。
+
+    Args:
+        values: 净值序列（按日期升序）
+
+    Returns:
+        (MA5, MA10, MA20, MA60)
+    """
+    arr = np.ascontiguousarray(values)
+    if not np.issubdtype(arr.dtype, np.floating):
+        arr = arr.astype(np.float64)
+    if NUMBA_AVAILABLE and _load_jit():
+        return _tail_mas_jit(arr)
+    return (
+        _tail_mean(arr, 5),
+        _tail_mean(arr, 10),
+        _tail_mean(arr, 20),
+        _tail_mean(arr, 60),
+    )
+
+
+def batch_scores(
+    navs: np.ndarray, year_1: np.ndarray, month_1: np.ndarray,
+    chase_high: float, pullback_buy: float
+) -> Tuple[np.ndarray, ...]:
+    """
+    批量计算多只基金的均线、趋势强度、回调幅度、综合评分与理由位标志
+
+    Args:
+        navs: (N, W) 净值矩阵（float32/float64），每行为一只基金最近 W 个净值（右对齐，不足的用 NaN 补齐）
+        year_1: (N,) 近1年收益（%）
+        month_1: (N,) 近1月收益（%）
+        chase_high: 追高阈值（距 MA5 %）
+        pullback_buy: 回调买入阈值（距 MA5 %）
+
+    Returns:
+        (ma5, ma10, ma20, ma60, 最新净值, 趋势强度, 距MA5 %, 距MA20 %, 评分, 理由位标志)，
+        均为长度 N 的数组
+    """
+    navs = np.ascontiguousarray(navs)
+    if not np.issubdtype(navs.dtype, np.floating):
+        navs = navs.astype(np.float64)
+    year_1 = np.ascontiguousarray(year_1, dtype=np.float64)
+    month_1 = np.ascontiguousarray(month_1, dtype=np.float64)
+    if NUMBA_AVAILABLE and _load_jit():
+        return _batch_scores_jit(navs, year_1, month_1, float(chase_high), float(pullback_buy))
+    return _batch_scores_numpy(navs, year_1, month_1, chase_high, pullback_buy)
+
+
+def warmup() -> None:
+    """
+    预热 JIT 内核
+
+    导入 numba，并用一个小数组触发 tail_mas 内核的编译（或从磁盘缓存加载编译结果），
+    避免第一只基金的分析承担导入和编译耗时。未安装 numba 时什么也不做。
+    分析器统一以 float32 净值调用（见 FundTrendAnalyzer._unpack_navs），只预热这一种签名。
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    try:
+        tail_mas(np.ones(16, dtype=np.float32))
+    except Exception as e:
+        logger.warning(f"numba 预热失败: {e}")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基金数据解析测试（离线）
+
+CPython 下 get_fund_performance_from/get_fund_holdings_from 走 pandas 向量化实现，
+PyPy 下走 _parse_performance_records/_parse_holding_records 纯 Python 实现；
+两条路径对同一份 AkShare 原始数据的解析结果必须一致。
+
+净值历史：用构造的 lsjz JSON 分页响应驱动 _LsjzPager，
+并在临时缓存目录中验证历史的合并、缺口检测与过期判断。
+
+使用方法：
+    python -m pytest test_fund_fetcher.py
+    python test_fund_fetcher.py
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_provider.fund_fetcher import (
+    FundDataFetcher,
+    _LsjzPager,
+    _parse_holding_records,
+    _parse_performance_records,
+)
+
+
+def _performance_frame() -> pd.DataFrame:
+    """模拟 "阶段涨幅" 原始数据，涨幅列混有百分号、空值和无法解析的文本"""
+    return pd.DataFrame({
+        '指标': ['近1周', '近1月', '近3月', '近6月', '今年来', '近1年', '近3年', '成立来'],
+        '涨幅': ['1.5%', None, 'abc', '--', '3%', -2.25, np.nan, '12.0%'],
+    })
+
+
+def test_performance_parsers_match():
+    """向量化解析与纯 Python 解析的业绩结果一致"""
+    df = _performance_frame()
+    fetcher = FundDataFetcher()
+    try:
+        vectorized = fetcher.get_fund_performance_from(df, '000001')
+    finally:
+        fetcher.close()
+    pure = _parse_performance_records(df.to_dict('records'))
+
+    assert vectorized == pure
+    assert pure == {
+        'week_1': 1.5,
+        'month_1': 0.0,
+        'month_3': 0.0,
+        'month_6': 0.0,
+        'year_1': -2.25,
+        'year_3': 0.0,
+    }
+
+
+def test_holding_parsers_match():
+    """向量化解析与纯 Python 解析的持仓结果一致（含缺失列和超过 10 条的情况）"""
+    df = pd.DataFrame({
+        '股票代码': [f'{i:06d}' for i in range(12)],
+        '股票名称': [f'股票{i}' for i in range(12)],
+    })
+    fetcher = FundDataFetcher()
+    try:
+        vectorized = fetcher.get_fund_holdings_from(df, '000001')
+    finally:
+        fetcher.close()
+    pure = _parse_holding_records(df.head(10).to_dict('records'))
+
+    assert vectorized == pure
+    assert len(pure) == 10
+    assert set(pure[0]) == {'stock_code', 'stock_name', 'ratio'}
+
+
+def _lsjz_records(count: int, last: date = date(2024, 6, 30)) -> list:
+    """按日期降序（与 lsjz 接口一致）的净值记录，最新一条日期为 last"""
+    return [
+        {'FSRQ': (last - timedelta(days=i)).isoformat(), 'DWJZ': f"{1 + i * 0.001:.4f}", 'JZZZL': '0.10'}
+        for i in range(count)
+    ]
+
+
+def _serve(records: list, cap: int, with_total: bool = True):
+    """模拟 lsjz 接口：单页最多返回 cap 条，按实际页大小计算偏移"""
+    requests = []
+
+    def get(params: dict) -> dict:
+        requests.append((params['pageIndex'], params['pageSize']))
+        size = min(params['pageSize'], cap)
+        start = (params['pageIndex'] - 1) * size
+        data = {'Data': {'LSJZList': records[start:start + size]}}
+        if with_total:
+            data['TotalCount'] = len(records)
+        return data
+
+    return get, requests
+
+
+def _drain(fund_code: str, rows: int, get) -> tuple:
+    pager = _LsjzPager(fund_code, rows)
+    while not pager.done:
+        pager.add(get(pager.params))
+    return pager.result()
+
+
+def test_lsjz_pager_capped_page_size():
+    """接口单页条数有上限时按实际页大小翻页，直到取满 rows 条"""
+    records = _lsjz_records(300)
+    get, requests = _serve(records, cap=20)
+    df, total = _drain('000001', 120, get)
+
+    assert total == 300
+    assert len(df) == 120
+    assert df['净值日期'].tolist() == [r['FSRQ'] for r in records[:120]]
+    assert requests == [(1, 120)] + [(i, 20) for i in range(2, 7)]
+
+
+def test_lsjz_pager_short_history():
+    """净值总数少于 rows 时取完即止；接口未返回 TotalCount 时以实际条数代替"""
+    records = _lsjz_records(30)
+
+    get, requests = _serve(records, cap=20)
+    df, total = _drain('000001', 120, get)
+    assert (len(df), total, len(requests)) == (30, 30, 2)
+
+    get, requests = _serve(records, cap=1000)
+    df, total = _drain('000001', 120, get)
+    assert (len(df), total, len(requests)) == (30, 30, 1)
+
+    get, requests = _serve(records[:5], cap=20, with_total=False)
+    df, total = _drain('000001', 120, get)
+    assert (len(df), total) == (5, 5)
+
+    get, _ = _serve([], cap=20)
+    assert _drain('000001', 120, get) == (None, 0)
+
+
+def _frame(records: list) -> pd.DataFrame:
+    get, _ = _serve(records, cap=len(records) or 1)
+    return _drain('000001', len(records), get)[0]
+
+
+def test_nav_history_merge_and_gap(tmp_path):
+    """全量写入、增量合并（重复日期取新值）与缺口检测"""
+    fetcher = FundDataFetcher(cache_dir=tmp_path)
+    try:
+        records = _lsjz_records(120, last=date(2024, 6, 30))
+        history = fetcher._update_nav_history('000001', None, _frame(records), 300)
+        assert history['净值日期'].is_monotonic_increasing
+        assert len(history) == 120
+
+        loaded, fresh = fetcher._load_nav_history('000001', 120)
+        assert fresh
+        assert loaded.equals(history)
+
+        # 增量页与历史重叠 5 天，其中最后一天净值被修正，另有 1 天新数据
+        increment = _lsjz_records(6, last=date(2024, 7, 1))
+        increment[1]['DWJZ'] = '9.9999'
+        merged = fetcher._update_nav_history('000001', history, _frame(increment), 301)
+        assert len(merged) == 121
+        assert merged['净值日期'].iloc[-1] == '2024-07-01'
+        assert merged.loc[merged['净值日期'] == '2024-06-30', '单位净值'].tolist() == ['9.9999']
+        with fetcher._nav_history_path('000001').open('rb') as f:
+            _, total = pickle.load(f)
+        assert total == 301
+
+        # 增量页最早一天仍晚于历史最后一天：中间有缺口，需要全量获取
+        gap = _lsjz_records(5, last=date(2024, 8, 1))
+        assert fetcher._update_nav_history('000001', merged, _frame(gap), 330) is None
+    finally:
+        fetcher.close()
+
+
+def test_nav_history_completeness_and_format(tmp_path):
+    """历史不足 min(days, 总条数) 或为旧格式文件时视为不存在"""
+    fetcher = FundDataFetcher(cache_dir=tmp_path)
+    try:
+        # 新基金只有 30 条净值：取全即完整
+        fetcher._update_nav_history('000001', None, _frame(_lsjz_records(30)), 30)
+        history, fresh = fetcher._load_nav_history('000001', 120)
+        assert len(history) == 30 and fresh
+
+        # 总共 300 条却只存了 30 条：不完整
+        fetcher._update_nav_history('000002', None, _frame(_lsjz_records(30)), 300)
+        assert fetcher._load_nav_history('000002', 120) == (None, False)
+
+        # 旧格式（只有 DataFrame，没有总条数）
+        path = fetcher._nav_history_path('000003')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('wb') as f:
+            pickle.dump(_frame(_lsjz_records(120)), f)
+        assert fetcher._load_nav_history('000003', 120) == (None, False)
+    finally:
+        fetcher.close()
+
+
+def test_nav_history_expires_on_new_day(tmp_path):
+    """前一天写入的净值历史即使未超过 TTL 也视为过期"""
+    fetcher = FundDataFetcher(cache_dir=tmp_path, ttls={'nav': 48 * 3600})
+    try:
+        fetcher._update_nav_history('000001', None, _frame(_lsjz_records(120)), 120)
+        assert fetcher._load_nav_history('000001', 120)[1]
+
+        # 修改时间设为昨天 23:59（距今不足 48h，但不是今天写入的）
+        yesterday = datetime.combine(date.today(), datetime.min.time()) - timedelta(minutes=1)
+        mtime = yesterday.timestamp()
+        os.utime(fetcher._nav_history_path('000001'), (mtime, mtime))
+        assert time.time() - mtime < 48 * 3600
+        history, fresh = fetcher._load_nav_history('000001', 120)
+        assert history is not None and not fresh
+    finally:
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    test_performance_parsers_match()
+    test_holding_parsers_match()
+    test_lsjz_pager_capped_page_size()
+    test_lsjz_pager_short_history()
+    test_nav_history_merge_and_gap(Path(tempfile.mkdtemp()))
+    test_nav_history_completeness_and_format(Path(tempfile.mkdtemp()))
+    test_nav_history_expires_on_new_day(Path(tempfile.mkdtemp()))
+    print("✅ 解析与净值历史测试通过")
+    sys.exit(0)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+均线/评分内核一致性测试（离线）
+
+FundTrendAnalyzer.analyze_batch 的评分由 indicators.batch_scores 计算
+（安装 numba 时走并行 JIT 内核，否则走 NumPy 实现），逐只 analyze 则走 Python 评分；
+三条路径的结果必须逐位一致，否则阈值附近的基金会得到不同的建议。
+analyze 的结果缓存命中时也必须与重新分析的结果一致。
+
+使用方法：
+    python -m pytest test_indicators.py
+    python test_indicators.py
+"""
+
+import math
+import sys
+from contextlib import contextmanager
+
+import numpy as np
+
+from src import indicators
+from src.fund_analyzer import (
+    _SCORE_OFFSET,
+    _SCORE_TO_SIGNAL,
+    BuySignal,
+    FundAnalysisResult,
+    FundTrendAnalyzer,
+    ReasonFlag,
+    TrendStatus,
+)
+
+
+@contextmanager
+def _numba(enabled: bool):
+    """临时切换 JIT / NumPy 实现"""
+    saved = indicators.NUMBA_AVAILABLE
+    indicators.NUMBA_AVAILABLE = saved and enabled
+    try:
+        yield
+    finally:
+        indicators.NUMBA_AVAILABLE = saved
+
+
+def _same(a: dict, b: dict) -> bool:
+    """比较两个 to_dict 结果，NaN 与 NaN 视为相等"""
+    if a.keys() != b.keys():
+        return False
+    for key in a:
+        x, y = a[key], b[key]
+        if isinstance(x, float) and isinstance(y, float) and math.isnan(x) and math.isnan(y):
+            continue
+        if x != y:
+            return False
+    return True
+
+
+def _random_items(seed: int = 0, count: int = 1500):
+    """随机净值：长度覆盖空、不足 5 个、不足 60 个和超过 60 个，部分含 NaN，收益取阈值附近的值"""
+    rng = np.random.default_rng(seed)
+    lengths = [0, 1, 3, 4, 5, 6, 10, 20, 59, 60, 61, 150]
+    items = []
+    for i in range(count):
+        n = lengths[i] if i < len(lengths) else int(rng.integers(0, 150))
+        nav = 1 + np.cumsum(rng.normal(0, 0.02, n))
+        if n and rng.random() < 0.2:
+            nav[rng.random(n) < 0.1] = np.nan
+        performance = None
+        if rng.random() < 0.8:
+            performance = {
+                'week_1': float(rng.normal(0, 3)),
+                'month_1': float(rng.choice([15.0, 15.1, rng.normal(5, 8)])),
+                'month_3': float(rng.normal(0, 10)),
+                'month_6': float(rng.normal(0, 15)),
+                'year_1': float(rng.choice([-0.1, 0.0, 10.0, 20.0, rng.normal(10, 15)])),
+            }
+        items.append((f"{i:06d}", f"基金{i}", nav, performance))
+    return items
+
+
+def test_batch_matches_scalar():
+    """analyze_batch 与逐只 analyze 结果一致（JIT 与 NumPy 两种实现）"""
+    items = _random_items()
+    analyzer = FundTrendAnalyzer()
+    expected = [analyzer.analyze(nav, code, name, perf).to_dict() for code, name, nav, perf in items]
+    for enabled in (True, False):
+        with _numba(enabled):
+            got = [r.to_dict() for r in FundTrendAnalyzer().analyze_batch(items)]
+        mismatches = [e['code'] for e, g in zip(expected, got) if not _same(e, g)]
+        assert not mismatches, f"numba={enabled} 不一致的基金: {mismatches[:10]}"
+
+
+def test_score_to_signal_boundaries():
+    """评分 -> 建议的分档边界与原 if/elif 阶梯一致"""
+    def ladder(score: int) -> BuySignal:
+        if score >= 4:
+            return BuySignal.STRONG_BUY
+        if score >= 2:
+            return BuySignal.BUY
+        if score >= 0:
+            return BuySignal.HOLD
+        if score >= -2:
+            return BuySignal.WAIT
+        if score >= -4:
+            return BuySignal.SELL
+        return BuySignal.STRONG_SELL
+
+    for score in range(-8, 9):
+        pos = min(max(score + _SCORE_OFFSET, 0), len(_SCORE_TO_SIGNAL) - 1)
+        assert _SCORE_TO_SIGNAL[pos] is ladder(score), score
+
+
+# 距 MA5 恰好落在分界点上：(当前净值, 回调状态, 回调部分的评分, 理由位标志)
+_PULLBACK_CASES = [
+    (97.0, "大幅回调，关注支撑", 2, ReasonFlag.PULLBACK_BUY),
+    (100.0, "回调至均线附近，买入时机", 2, ReasonFlag.PULLBACK_BUY),
+    (103.0, "接近均线，可以关注", 1, ReasonFlag.NEAR_MA),
+    (105.0, "接近均线，可以关注", 0, 0),
+    (110.0, "偏离均线，建议等待回调", -1, ReasonFlag.OFF_MA),
+    (111.0, "严重偏离均线，追高风险", -2, ReasonFlag.CHASE_HIGH),
+]
+
+
+def _boundary_nav(current: float) -> np.ndarray:
+    """构造 MA5 = MA10 = MA20 = 100（震荡整理）且最新净值为 current 的序列，各值在 float32 下精确表示"""
+    x = (500.0 - current) / 4
+    return np.array([100.0] * 55 + [x] * 4 + [current])
+
+
+def test_pullback_boundaries():
+    """回调分界点 -3/0/5/10 上，Python 评分、标量内核、批量内核结果一致"""
+    analyzer = FundTrendAnalyzer()
+    kernels = [indicators._trend_score_kernel]
+    if indicators.NUMBA_AVAILABLE and indicators._load_jit():
+        kernels.append(indicators._trend_score_jit)
+
+    for current, status, pullback_score, flag in _PULLBACK_CASES:
+        pb5 = current - 100.0
+        result = analyzer.analyze(_boundary_nav(current), 'boundary')
+        assert result.trend_status is TrendStatus.CONSOLIDATION
+        assert result.pullback_from_ma5 == pb5
+        assert result.pullback_status == status
+        assert result.signal_score == pullback_score
+        assert result.reason_flags == ReasonFlag.SIDEWAYS | flag
+
+        for kernel in kernels:
+            trend, k_pb5, _, score, flags = kernel(
+                current, 100.0, 100.0, 100.0, 0.0, 0.0,
+                analyzer.CHASE_HIGH_THRESHOLD, analyzer.PULLBACK_BUY_THRESHOLD
+            )
+            assert (trend, k_pb5, score, flags) == (0, pb5, pullback_score, result.reason_flags)
+
+        for enabled in (True, False):
+            with _numba(enabled):
+                batch = analyzer.analyze_batch([('boundary', '', _boundary_nav(current), None)])[0]
+            assert _same(batch.to_dict(), result.to_dict()), (current, enabled)
+
+
+def test_pullback_status_lookup():
+    """_analyze_pullback 的二分查找与 analyze_batch 的 searchsorted 分档一致"""
+    analyzer = FundTrendAnalyzer()
+    for pb5 in (-8.0, -3.0001, -3.0, -1.0, 0.0, 0.0001, 5.0, 5.0001, 10.0, 10.0001, float('nan')):
+        result = FundAnalysisResult(code='x', pullback_from_ma5=pb5)
+        analyzer._analyze_pullback(result)
+        idx = np.searchsorted(analyzer.PULLBACK_BOUNDS, np.array([pb5]), side='left')
+        idx[np.isnan([pb5])] = 0
+        assert result.pullback_status == analyzer.PULLBACK_STATUSES[idx[0]], pb5
+
+
+def test_result_cache_distinguishes_histories():
+    """只传净值数组时，代码、长度和最新净值都相同但走势不同的两段历史不能命中同一条缓存"""
+    up = np.linspace(0.8, 1.1, 120)
+    down = np.concatenate([np.linspace(1.6, 1.2, 110), np.linspace(1.15, 1.1, 10)])
+    analyzer = FundTrendAnalyzer()
+    first = analyzer.analyze(up, '000001')
+    second = analyzer.analyze(down, '000001')
+    fresh = FundTrendAnalyzer().analyze(down, '000001')
+    assert first.trend_status != fresh.trend_status
+    assert _same(second.to_dict(), fresh.to_dict())
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar()
+    test_score_to_signal_boundaries()
+    test_pullback_boundaries()
+    test_pullback_status_lookup()
+    test_result_cache_distinguishes_histories()
+    print("✅ 指标内核一致性测试通过")
+    sys.exit(0)